@@ -3,6 +3,7 @@ import requests
 import subprocess
 import ctypes
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication, QMessageBox
 from modules.utils.file_helpers import FileHelper
 from modules.windows.main import MainWindow
@@ -169,4 +170,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Multi-file loading parses in worker processes, also in the bundled app
     main()
@@ -0,0 +1,66 @@
+"""
+Compares SRFormatter's vectorized SR # formatting with the row-by-row loop it replaced.
+
+Both paths format the same frame (a synthetic export, or --input), their SR # and Description
+output is checked for equality, and the timings are printed.
+
+Run from the repository root with: python -m benchmarks.sr_formatter_benchmark --rows 500000
+"""
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+from modules.sr_formatter.sr_formatter import SRFormatter
+
+
+def synthetic_export(rows, seed=0):
+    """An export-like frame whose SR # mixes well-formed, unpadded, malformed and missing values."""
+    rng = np.random.default_rng(seed)
+    prefixes = np.array(["SR", "24", "25", "WO"])
+    descriptions = np.array(["Pothole", "Graffiti Removal", "Tree Trimming - Urgent", "Missed Pickup", ""])
+    sr_numbers = pd.Series(prefixes[rng.integers(0, len(prefixes), rows)], dtype=object) + "-" + \
+        pd.Series(rng.integers(1, 10 ** 6, rows)).astype(str) + " " + \
+        pd.Series(descriptions[rng.integers(0, len(descriptions), rows)], dtype=object)
+    malformed = rng.random(rows) < 0.02
+    sr_numbers[malformed] = "SR-1-2 " + sr_numbers[malformed]
+    sr_numbers[rng.random(rows) < 0.01] = None
+    return pd.DataFrame({"SR #": sr_numbers, "Status": "Open", "Created Date": "2024-01-01 08:00:00"})
+
+
+def time_path(formatter, df, vectorized):
+    started = time.perf_counter()
+    result = formatter._process_data(df.copy(), vectorized=vectorized)
+    return result, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.sr_formatter_benchmark",
+                                     description="Time the vectorized and row-loop SR # formatting.")
+    parser.add_argument("--rows", type=int, default=500000, help="Rows of the synthetic export (default: 500000)")
+    parser.add_argument("--input", help="Format this export (.xlsx or .csv) instead of a synthetic one")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        df = pd.read_csv(args.input) if args.input.lower().endswith(".csv") else pd.read_excel(args.input)
+    else:
+        df = synthetic_export(args.rows)
+    formatter = SRFormatter()
+
+    vectorized, vectorized_seconds = time_path(formatter, df, True)
+    looped, loop_seconds = time_path(formatter, df, False)
+
+    identical = all(
+        vectorized[col].astype(object).where(vectorized[col].notna(), None).tolist()
+        == looped[col].astype(object).where(looped[col].notna(), None).tolist()
+        for col in vectorized.columns[:2]
+    )
+    print(f"Rows:        {len(df)}")
+    print(f"Row loop:    {loop_seconds:.3f}s")
+    print(f"Vectorized:  {vectorized_seconds:.3f}s ({loop_seconds / max(vectorized_seconds, 1e-9):.0f}x faster)")
+    print(f"Identical:   {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,14 @@
-from modules.utils import LoggerManager
-from modules.utils import FileHelper
-from modules.utils import AppSettings
-from modules.windows import MainWindow
-from modules.sr_counter import ReportGenerator
-from modules.sr_formatter import sr_formatter
-from modules.dialogs import SettingsDialog
+import importlib
+
+# Exports are imported on first access, so headless tools (e.g. modules.sr_counter.cli) never load Qt
+_EXPORTS = {
+    'LoggerManager': 'modules.utils',
+    'FileHelper': 'modules.utils',
+    'AppSettings': 'modules.utils',
+    'MainWindow': 'modules.windows',
+    'ReportGenerator': 'modules.sr_counter',
+    'SettingsDialog': 'modules.dialogs',
+}
 
 # Define what will be accessible when importing this module
 __all__ = [
@@ -16,3 +20,11 @@ __all__ = [
     'SettingsDialog',
     'sr_formatter'
 ]
+
+
+def __getattr__(name):
+    if name == 'sr_formatter':
+        return importlib.import_module('modules.sr_formatter.sr_formatter')
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,7 @@
 # settings_handler.py
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QComboBox
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QPushButton, QComboBox, QMessageBox
 from modules.utils import AppSettings
+from modules.utils.dataset_cache import DatasetCache
 from modules.dialogs.editable_table_dialog import EditableTableDialog
 
 class SettingsHandler(QDialog):
@@ -46,6 +47,11 @@ class SettingsHandler(QDialog):
         layout.addWidget(edit_types_button)
         layout.addWidget(edit_groups_button)
 
+        # Button to remove cached copies of previously loaded files
+        clear_cache_button = QPushButton("Clear Dataset Cache")
+        clear_cache_button.clicked.connect(self.clear_dataset_cache)
+        layout.addWidget(clear_cache_button)
+
         # Save button
         save_button = QPushButton("Save")
         save_button.clicked.connect(self.save_settings)
@@ -65,6 +71,11 @@ class SettingsHandler(QDialog):
         if dialog.exec() == QDialog.DialogCode.Accepted:
             pass  # Post-editing logic for groups can go here if needed
 
+    def clear_dataset_cache(self):
+        """Delete all cached datasets so every file is read from disk on its next load."""
+        DatasetCache().clear()
+        QMessageBox.information(self, "Dataset Cache", "The dataset cache has been cleared.")
+
     def track_change(self, setting_name):
         """Track changed settings by adding them to the changed_settings list."""
         if setting_name not in self.changed_settings:
@@ -1,5 +1,16 @@
-from modules.sr_counter.report_generator import ReportGenerator
-from modules.sr_counter.settings_handler import SettingsHandler
-from modules.sr_counter.sr_counter_ui import SRCounterUI
+import importlib
+
+# Exports are imported on first access, so the headless CLI does not load the Qt UI
+_EXPORTS = {
+    'ReportGenerator': 'modules.sr_counter.report_generator',
+    'SettingsHandler': 'modules.sr_counter.settings_handler',
+    'SRCounterUI': 'modules.sr_counter.sr_counter_ui',
+}
 
 __all__ = ['ReportGenerator', 'SRCounterUI','SettingsHandler']
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,174 @@
+"""
+Batch SR Counter runs: one job file lists many report specs over the same exports.
+
+The exports are read and prepared once; every spec is then answered from that dataset
+(and the count cube built over it), and the Excel files are written in a process pool.
+
+Example job file (JSON, or YAML when PyYAML is installed):
+
+    {
+        "inputs": ["exports/"],
+        "output_dir": "reports",
+        "defaults": {"start": "2024-01-01", "end": "2024-12-31 23:59:59", "exclusions": "settings"},
+        "reports": [
+            {"name": "by-type", "columns": ["Type Description"]},
+            {"name": "by-group-business-hours", "columns": ["Group Description"],
+             "start_time": "08:00", "end_time": "17:00", "exclusions": "none"}
+        ]
+    }
+
+Run with: python -m modules.sr_counter.batch weekly.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from modules.utils.app_settings import AppSettings
+from modules.utils.dataset_loader import DatasetLoader
+from modules.utils.location_helper import LocationHelper
+from modules.utils.logger_manager import LoggerManager
+from modules.sr_counter.cli import parse_datetime, parse_time, load_exclusion_settings
+from modules.sr_counter.exclusion_compiler import ExclusionCompiler
+from modules.sr_counter.report_generator import ReportGenerator
+
+
+class ReportSpec:
+    """One report of a job file, with the job defaults applied."""
+
+    def __init__(self, spec, defaults, output_dir):
+        spec = {**defaults, **spec}
+        missing = [key for key in ("name", "columns", "start", "end") if not spec.get(key)]
+        if missing:
+            raise ValueError(f"Report spec {spec.get('name', '?')!r} is missing {missing}")
+        self.name = spec["name"]
+        self.columns = list(spec["columns"])
+        self.start_date = parse_datetime(str(spec["start"]))
+        self.end_date = parse_datetime(str(spec["end"]))
+        self.start_time = parse_time(str(spec["start_time"])) if spec.get("start_time") else None
+        self.end_time = parse_time(str(spec["end_time"])) if spec.get("end_time") else None
+        if bool(self.start_time) != bool(self.end_time):
+            raise ValueError(f"Report spec {self.name!r} needs both start_time and end_time")
+        self.sort_by = spec.get("sort_by")
+        self.exclusions = spec.get("exclusions", "none")
+        self.output = os.path.join(output_dir, spec.get("output") or f"{self.name}.xlsx")
+
+
+class BatchRunner:
+    """Runs every report of a job file against one prepared dataset."""
+
+    def __init__(self, job, settings=None, use_cache=True, max_workers=None, logger=None):
+        self.logger = logger if logger else LoggerManager()
+        self.settings = settings if settings else AppSettings()
+        self.inputs = job.get("inputs", [])
+        output_dir = job.get("output_dir", ".")
+        self.specs = [ReportSpec(spec, job.get("defaults", {}), output_dir) for spec in job.get("reports", [])]
+        self.loader = DatasetLoader.from_settings(self.settings, use_cache=use_cache)
+        self.report_generator = ReportGenerator(None)  # Shared, so its count cube and report cache serve every spec
+        self.exclusion_compiler = ExclusionCompiler(self.logger)
+        self.max_workers = max_workers
+        self.timings = []  # (name, rows, generate seconds, write seconds, output or error)
+
+    @staticmethod
+    def load_job(job_path):
+        """Read a JSON job file, or a YAML one when PyYAML is installed."""
+        with open(job_path, 'r') as f:
+            if job_path.lower().endswith(('.yml', '.yaml')):
+                try:
+                    import yaml
+                except ImportError:
+                    raise ValueError("YAML job files need PyYAML; install it or use a JSON job file")
+                return yaml.safe_load(f) or {}
+            return json.load(f)
+
+    def compile_exclusions(self, profile):
+        return self.exclusion_compiler.compile(load_exclusion_settings(profile, self.settings))
+
+    def run(self):
+        """Load the data once, generate every report, then write them in parallel. Returns the failure count."""
+        started = time.perf_counter()
+        file_paths = DatasetLoader.expand_paths(self.inputs)
+        if not file_paths:
+            raise ValueError("The job's inputs hold no export files")
+
+        # One read covering the columns of every spec
+        profiles = {spec.exclusions: self.compile_exclusions(spec.exclusions) for spec in self.specs}
+        columns = DatasetLoader.BASE_COLUMNS + [self.loader.preparer.keep_latest_by]
+        for spec in self.specs:
+            columns += spec.columns
+        for exclusions in profiles.values():
+            columns += exclusions.columns
+        columns = [col for col in dict.fromkeys(columns) if col and col != LocationHelper.HAS_LOCATION_COLUMN]
+        dataset = self.loader.read_dataset(file_paths, columns)
+        if dataset is None:
+            raise ValueError("The job's inputs could not be read")
+        self.logger.log_info(f"Batch loaded {len(dataset)} rows in {time.perf_counter() - started:.2f}s")
+
+        results = {}  # spec index -> timings row
+        reports = []
+        for index, spec in enumerate(self.specs):
+            spec_started = time.perf_counter()
+            report_df = self.report_generator.generate_report(
+                dataset, spec.columns, spec.start_date, spec.end_date, spec.start_time, spec.end_time,
+                sort_by=spec.sort_by, exclusions=profiles[spec.exclusions])
+            seconds = time.perf_counter() - spec_started
+            if report_df is None:
+                results[index] = (spec.name, 0, seconds, 0.0, "failed to generate")
+            else:
+                reports.append((index, spec, report_df, seconds))
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [(index, spec, report_df, seconds,
+                        pool.submit(write_report_file, report_df, spec.output, spec.start_time, spec.end_time))
+                       for index, spec, report_df, seconds in reports]
+            for index, spec, report_df, seconds, future in futures:
+                try:
+                    results[index] = (spec.name, len(report_df), seconds, future.result(), spec.output)
+                except Exception as e:
+                    self.logger.log_error(f"Failed to write report {spec.name}: {e}")
+                    results[index] = (spec.name, len(report_df), seconds, 0.0, f"failed to write: {e}")
+
+        self.timings = [results[index] for index in sorted(results)]
+        self.logger.log_info(f"Batch of {len(self.specs)} reports finished in {time.perf_counter() - started:.2f}s")
+        return sum(1 for *_, result in self.timings if result.startswith("failed"))
+
+    def summary(self):
+        """Per-report timings as printable lines."""
+        lines = [f"{'Report':<30} {'Rows':>6} {'Generate':>9} {'Write':>7}  Output"]
+        for name, rows, generate_seconds, write_seconds, result in self.timings:
+            lines.append(f"{name:<30} {rows:>6} {generate_seconds:>8.2f}s {write_seconds:>6.2f}s  {result}")
+        return "\n".join(lines)
+
+
+def write_report_file(report_df, file_path, start_time=None, end_time=None):
+    """Write one report workbook and return the seconds taken. Module-level so it runs in worker processes."""
+    started = time.perf_counter()
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    if os.path.exists(file_path):
+        os.remove(file_path)  # So a failed write cannot leave last week's report looking current
+    ReportGenerator(None).write_report(report_df, file_path, start_time, end_time)
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.sr_counter.batch",
+                                     description="Generate every SR Counter report listed in a job file.")
+    parser.add_argument("job", help="Job file (.json, or .yml/.yaml with PyYAML installed)")
+    parser.add_argument("--workers", type=int, help="Processes writing the Excel files (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the dataset cache")
+    args = parser.parse_args(argv)
+
+    try:
+        runner = BatchRunner(BatchRunner.load_job(args.job), use_cache=not args.no_cache, max_workers=args.workers)
+        failures = runner.run()
+    except (OSError, ValueError) as e:
+        print(f"Batch failed: {e}", file=sys.stderr)
+        return 1
+
+    print(runner.summary())
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
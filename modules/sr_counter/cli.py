@@ -0,0 +1,105 @@
+"""
+Headless SR Counter: build a report from the command line without loading Qt.
+
+Example:
+    python -m modules.sr_counter.cli exports/ --columns "Type Description" "Group Description" \
+        --start 2024-01-01 --end "2024-12-31 23:59:59" --exclusions settings --output report.xlsx
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime
+from modules.utils.app_settings import AppSettings
+from modules.utils.dataset_loader import DatasetLoader
+from modules.utils.location_helper import LocationHelper
+from modules.utils.logger_manager import LoggerManager
+from modules.sr_counter.exclusion_compiler import ExclusionCompiler
+from modules.sr_counter.report_generator import ReportGenerator
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.sr_counter.cli",
+                                     description="Generate an SR Counter report without the desktop UI.")
+    parser.add_argument("inputs", nargs="+", help="Export files (.csv, .xlsx, .xls) or folders of exports")
+    parser.add_argument("--columns", nargs="+", required=True, help="Columns to group the report by")
+    parser.add_argument("--start", required=True, type=parse_datetime, help="Start date, e.g. 2024-01-01")
+    parser.add_argument("--end", required=True, type=parse_datetime,
+                        help="End date/time (inclusive), e.g. '2024-12-31 23:59:59'")
+    parser.add_argument("--start-time", type=parse_time, help="Start of the daily time frame, e.g. 08:00")
+    parser.add_argument("--end-time", type=parse_time, help="End of the daily time frame, e.g. 17:00")
+    parser.add_argument("--sort-by", help="Report column to sort by")
+    parser.add_argument("--exclusions", default="none",
+                        help="'none', 'settings' for the saved exclusions, or a JSON file with the same keys")
+    parser.add_argument("--output", required=True, help="Excel file to write")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the dataset cache")
+    args = parser.parse_args(argv)
+    if bool(args.start_time) != bool(args.end_time):
+        parser.error("--start-time and --end-time must be given together")
+    return args
+
+
+def parse_datetime(value):
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not an ISO date or date-time: {value!r}")
+
+
+def parse_time(value):
+    return parse_datetime(f"2000-01-01T{value}").time()
+
+
+def load_exclusion_settings(profile, settings):
+    """The exclusion settings named by --exclusions."""
+    if profile == "none":
+        return {}
+    if profile == "settings":
+        return settings.get("exclusions", {})
+    with open(profile, 'r') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logger = LoggerManager()
+    settings = AppSettings()
+
+    file_paths = DatasetLoader.expand_paths(args.inputs)
+    if not file_paths:
+        print("No export files found.", file=sys.stderr)
+        return 1
+
+    exclusions = ExclusionCompiler(logger).compile(load_exclusion_settings(args.exclusions, settings))
+    loader = DatasetLoader.from_settings(settings, use_cache=not args.no_cache)
+
+    # Read only the columns this report needs
+    columns = DatasetLoader.BASE_COLUMNS + [loader.preparer.keep_latest_by] + args.columns + exclusions.columns
+    columns = [col for col in dict.fromkeys(columns) if col and col != LocationHelper.HAS_LOCATION_COLUMN]
+
+    started = time.perf_counter()
+    dataset = loader.read_dataset(file_paths, columns)
+    if dataset is None:
+        print("The input could not be read.", file=sys.stderr)
+        return 1
+    print(f"Loaded {len(dataset)} rows from {len(file_paths)} file(s) in {time.perf_counter() - started:.2f}s"
+          f" ({dataset.duplicates_dropped} duplicates dropped, {dataset.unparseable_dates} unparseable dates)")
+
+    report_generator = ReportGenerator(None)
+    report_df = report_generator.generate_report(dataset, args.columns, args.start, args.end, args.start_time,
+                                                 args.end_time, sort_by=args.sort_by, exclusions=exclusions)
+    if report_df is None:
+        print("Failed to generate report; see the log for details.", file=sys.stderr)
+        return 1
+
+    try:
+        report_generator.write_report(report_df, args.output, args.start_time, args.end_time)
+    except Exception as e:
+        print(f"Failed to write {args.output}: {e}", file=sys.stderr)
+        return 1
+    print(f"Wrote {args.output} ({len(report_df)} rows) in {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+from modules.utils.logger_manager import LoggerManager
+from modules.utils.period_helper import PeriodHelper
+from modules.utils.time_index import TimeIndexHelper
+from modules.utils.location_helper import LocationHelper
+
+
+class CountCube:
+    """
+    Sparse pre-aggregated counts by type x group x day x hour (x has-location when the
+    dataset carries location data), built once per loaded dataset.
+
+    Whole days inside a date range are answered from the cube; the partial days at either
+    end of the range are read from the sorted raw rows, so results match the row-level path
+    exactly. Time frames are answered from the cube when they cover whole hours, e.g. 08:00 - 16:59.
+    """
+
+    DIMENSIONS = ["Type Description", "Group Description"]
+    DAY_NS = 86400 * 10**9
+
+    def __init__(self, logger=None):
+        self.logger = logger if logger else LoggerManager()
+        self.fingerprint = None
+        self.uniques = {}     # dimension column -> sorted unique values
+        self.row_codes = {}   # dimension column -> per-row code into uniques (-1 when missing)
+        self.day = None       # cube cell arrays, sorted by day
+        self.hour = None
+        self.period = None
+        self.cell_codes = {}
+        self.row_has_location = None  # Location flags per row and per cell, None without location data
+        self.cell_has_location = None
+        self.count = None
+
+    @staticmethod
+    def supports_frame(df):
+        """Check whether the frame has the columns a cube is built from."""
+        return all(col in df.columns for col in CountCube.DIMENSIONS) and TimeIndexHelper.is_indexed(df)
+
+    def build(self, dataset):
+        """Aggregate the prepared dataset's rows into cube cells."""
+        df = dataset.frame
+        self.fingerprint = dataset.fingerprint
+
+        epoch = df[TimeIndexHelper.EPOCH_COLUMN].to_numpy()
+        seconds = df[TimeIndexHelper.SECONDS_COLUMN].to_numpy()
+        valid = seconds >= 0  # Rows with a parsed 'Created Date'
+
+        for column in self.DIMENSIONS:
+            codes, uniques = pd.factorize(df[column], sort=True)
+            self.row_codes[column] = codes.astype(np.int32)
+            self.uniques[column] = uniques
+
+        # Pack day, hour and the dimension codes (shifted so missing is 0) into one sortable key
+        day = epoch[valid] // self.DAY_NS
+        first_day = int(day.min()) if len(day) else 0
+        key = (day - first_day) * 24 + seconds[valid] // 3600
+        radices = []
+        for column in self.DIMENSIONS:
+            radix = len(self.uniques[column]) + 1
+            key = key * radix + (self.row_codes[column][valid] + 1)
+            radices.append(radix)
+
+        if LocationHelper.HAS_LOCATION_COLUMN in df.columns:
+            self.row_has_location = df[LocationHelper.HAS_LOCATION_COLUMN].to_numpy()
+            key = key * 2 + self.row_has_location[valid]
+
+        cells, self.count = np.unique(key, return_counts=True)
+
+        if self.row_has_location is not None:
+            cells, has_location = np.divmod(cells, 2)
+            self.cell_has_location = has_location.astype(np.int8)
+        for column, radix in zip(reversed(self.DIMENSIONS), reversed(radices)):
+            cells, codes = np.divmod(cells, radix)
+            self.cell_codes[column] = (codes - 1).astype(np.int32)
+        day_offset, hour = np.divmod(cells, 24)
+        self.day = day_offset + first_day
+        self.hour = hour.astype(np.int8)
+        self.period = PeriodHelper.from_dates(pd.Series((self.day * self.DAY_NS).astype('datetime64[ns]')))
+
+        self.logger.log_info(f"Count cube built: {len(self.count)} cells from {int(valid.sum())} rows")
+        return self
+
+    def supports(self, group_columns, start_time=None, end_time=None, exclusions=None):
+        """Check whether a query can be answered from the cube."""
+        if not group_columns or any(col not in self.DIMENSIONS for col in group_columns):
+            return False
+        if len(set(group_columns)) != len(group_columns):
+            return False
+        if exclusions:
+            usable = self.DIMENSIONS + ([LocationHelper.HAS_LOCATION_COLUMN] if self.row_has_location is not None else [])
+            if any(col not in usable for col in exclusions.columns):
+                return False
+        if start_time and end_time:
+            start = TimeIndexHelper.time_to_seconds(start_time)
+            end = TimeIndexHelper.end_seconds(end_time)
+            return start % 3600 == 0 and end % 3600 == 3599
+        return True
+
+    def query(self, dataset, group_columns, periods, start_date, end_date, start_time=None, end_time=None, exclusions=None):
+        """
+        Count rows per group and period for the query.
+
+        :return: Tuple of (keys DataFrame, counts ndarray) like CrosstabEngine.count,
+                 or None when the query cannot be answered from the cube.
+        """
+        if dataset.fingerprint != self.fingerprint or not self.supports(group_columns, start_time, end_time, exclusions):
+            return None
+
+        df = dataset.frame
+        start_ns = TimeIndexHelper.to_epoch(start_date)
+        end_ns = TimeIndexHelper.to_epoch(end_date)
+        use_time = bool(start_time and end_time)
+
+        # Whole days [first_day, last_day) come from the cube, the rest from raw rows
+        first_day = -(-start_ns // self.DAY_NS)
+        last_day = end_ns // self.DAY_NS
+        if first_day < last_day:
+            raw_ranges = [(start_ns, first_day * self.DAY_NS - 1), (last_day * self.DAY_NS, end_ns)]
+            low, high = np.searchsorted(self.day, [first_day, last_day], side='left')
+        else:
+            raw_ranges = [(start_ns, end_ns)]
+            low = high = 0
+
+        cell_mask = np.ones(high - low, dtype=bool)
+        if use_time:
+            start_hour = TimeIndexHelper.time_to_seconds(start_time) // 3600
+            end_hour = TimeIndexHelper.end_seconds(end_time) // 3600
+            hours = self.hour[low:high]
+            if start_hour <= end_hour:
+                cell_mask = (hours >= start_hour) & (hours <= end_hour)
+            else:
+                cell_mask = (hours >= start_hour) | (hours <= end_hour)
+
+        parts_codes = {col: [self.cell_codes[col][low:high][cell_mask]] for col in self.DIMENSIONS}
+        parts_period = [self.period[low:high][cell_mask]]
+        parts_weight = [self.count[low:high][cell_mask]]
+        parts_location = []
+        if self.row_has_location is not None:
+            parts_location.append(self.cell_has_location[low:high][cell_mask])
+
+        epoch = df[TimeIndexHelper.EPOCH_COLUMN].to_numpy()
+        for range_start, range_end in raw_ranges:
+            row_start = np.searchsorted(epoch, range_start, side='left')
+            row_end = np.searchsorted(epoch, range_end, side='right')
+            rows = np.arange(row_start, row_end)
+            if use_time:
+                seconds = df[TimeIndexHelper.SECONDS_COLUMN].to_numpy()[row_start:row_end]
+                rows = rows[TimeIndexHelper.time_mask(seconds, start_time, end_time)]
+            for col in self.DIMENSIONS:
+                parts_codes[col].append(self.row_codes[col][rows])
+            parts_period.append(df[PeriodHelper.PERIOD_COLUMN].to_numpy()[rows])
+            parts_weight.append(np.ones(len(rows), dtype=np.int64))
+            if self.row_has_location is not None:
+                parts_location.append(self.row_has_location[rows])
+
+        codes = {col: np.concatenate(parts) for col, parts in parts_codes.items()}
+        period = np.concatenate(parts_period)
+        weight = np.concatenate(parts_weight)
+        has_location = np.concatenate(parts_location) if parts_location else None
+
+        keep = np.ones(len(weight), dtype=bool)
+        if exclusions:
+            def value_mask(column, values):
+                return exclusions.code_mask(codes[column], self.uniques[column], values)
+            keep = exclusions.combine(value_mask, has_location, len(weight))
+
+        return self._aggregate(group_columns, periods, codes, period, weight, keep)
+
+    def _aggregate(self, group_columns, periods, codes, period, weight, keep):
+        """Sum the selected cell weights into a group x period matrix."""
+        group_id = np.zeros(len(weight), dtype=np.int64)
+        for column in group_columns:
+            keep &= codes[column] >= 0
+            group_id = group_id * len(self.uniques[column]) + codes[column]
+
+        group_id = group_id[keep]
+        dense_ids, unique_ids = pd.factorize(group_id, sort=True)
+
+        period_positions = pd.Index(periods).get_indexer(period[keep])
+        in_range = period_positions >= 0
+        group_count = len(unique_ids)
+        period_count = len(periods)
+        counts = np.bincount(dense_ids[in_range] * period_count + period_positions[in_range],
+                             weights=weight[keep][in_range], minlength=group_count * period_count)
+        counts = counts.astype(np.int64).reshape(group_count, period_count)
+
+        keys = {}
+        remaining = np.asarray(unique_ids, dtype=np.int64)
+        for column in reversed(group_columns):
+            remaining, column_codes = np.divmod(remaining, len(self.uniques[column]))
+            keys[column] = np.asarray(self.uniques[column].take(column_codes))
+        keys = pd.DataFrame({col: keys[col] for col in group_columns}, columns=list(group_columns))
+
+        self.logger.log_debug(f"Count cube answered {group_count} groups x {period_count} periods")
+        return keys, counts
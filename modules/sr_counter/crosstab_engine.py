@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+from modules.utils.logger_manager import LoggerManager
+
+
+class CrosstabEngine:
+    """Counts rows per group key and period in one vectorized pass."""
+
+    def __init__(self, logger=None):
+        self.logger = logger if logger else LoggerManager()
+
+    def count(self, df, group_columns, period_column, periods):
+        """
+        Build the group x period count matrix for the DataFrame.
+
+        Groups are ordered the same way as df.groupby(group_columns) and rows
+        with a missing key are dropped, so the result lines up with the
+        legacy per-group loop.
+
+        :param df: The filtered DataFrame.
+        :param group_columns: Columns that make up the group key.
+        :param period_column: Column holding the period value of each row.
+        :param periods: Ordered period values that become count columns.
+        :return: Tuple of (keys DataFrame, counts ndarray of shape groups x periods).
+        """
+        group_ids, keys = self._factorize_groups(df, group_columns)
+
+        # Position of each row's period in the requested list, -1 if outside it
+        period_positions = pd.Index(periods).get_indexer(df[period_column].to_numpy())
+        in_range = (group_ids >= 0) & (period_positions >= 0)
+
+        group_count = len(keys)
+        period_count = len(periods)
+        flat_index = group_ids[in_range] * period_count + period_positions[in_range]
+        counts = np.bincount(flat_index, minlength=group_count * period_count)
+        counts = counts.reshape(group_count, period_count)
+
+        self.logger.log_debug(f"Crosstab built {group_count} groups x {period_count} periods from {len(df)} rows")
+        return keys, counts
+
+    def _factorize_groups(self, df, group_columns):
+        """Return a sorted group id per row (-1 for missing keys) and the unique key rows."""
+        row_count = len(df)
+        valid = np.ones(row_count, dtype=bool)
+        column_codes = []
+        column_uniques = []
+
+        for column in group_columns:
+            codes, uniques = pd.factorize(df[column], sort=True)
+            valid &= codes >= 0
+            column_codes.append(codes)
+            column_uniques.append(uniques)
+
+        valid_rows = np.flatnonzero(valid)
+
+        # Combine the per-column codes into one lexicographically ordered id,
+        # re-factorizing after each column so the id never overflows
+        combined = np.zeros(len(valid_rows), dtype=np.int64)
+        for codes, uniques in zip(column_codes, column_uniques):
+            combined = combined * len(uniques) + codes[valid_rows]
+            combined, _ = pd.factorize(combined, sort=True)
+            combined = combined.astype(np.int64, copy=False)
+
+        group_count = int(combined.max()) + 1 if len(combined) else 0
+
+        # First row of every group, used to read back the key values
+        first_rows = np.empty(group_count, dtype=np.int64)
+        first_rows[combined[::-1]] = valid_rows[::-1]
+
+        keys = pd.DataFrame({
+            column: np.asarray(uniques.take(codes[first_rows]))
+            for column, codes, uniques in zip(group_columns, column_codes, column_uniques)
+        }, columns=list(group_columns))
+
+        group_ids = np.full(row_count, -1, dtype=np.int64)
+        group_ids[valid_rows] = combined
+        return group_ids, keys
@@ -0,0 +1,205 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+from modules.utils.file_helpers import FileHelper
+from modules.utils.logger_manager import LoggerManager
+from modules.utils.location_helper import LocationHelper
+
+
+class CompiledExclusions:
+    """Exclusion rules resolved to description values, applied as one boolean mask."""
+
+    def __init__(self, column_values=None, no_location_excluded=None, no_location_included=None, cache_key=None, logger=None):
+        # column -> frozenset of values whose rows are dropped
+        self.column_values = self._freeze(column_values)
+        # column -> values whose rows are dropped when they have no location
+        self.no_location_excluded = self._freeze(no_location_excluded)
+        # column -> values whose rows are kept when they have no location (other no-location rows are dropped)
+        self.no_location_included = self._freeze(no_location_included)
+        self.cache_key = cache_key if cache_key is not None else json.dumps(
+            [self._describe(rules) for rules in (self.column_values, self.no_location_excluded, self.no_location_included)],
+            sort_keys=True)
+        self.logger = logger if logger else LoggerManager()
+
+    @staticmethod
+    def _freeze(rules):
+        return {col: frozenset(values) for col, values in (rules or {}).items() if values}
+
+    @staticmethod
+    def _describe(rules):
+        return {col: sorted(map(str, values)) for col, values in rules.items()}
+
+    @property
+    def uses_location(self):
+        """Whether any no-location rule is active."""
+        return bool(self.no_location_excluded or self.no_location_included)
+
+    @property
+    def columns(self):
+        """Columns the rules read."""
+        columns = list(self.column_values)
+        for rules in (self.no_location_excluded, self.no_location_included):
+            columns += [col for col in rules if col not in columns]
+        if self.uses_location:
+            columns.append(LocationHelper.HAS_LOCATION_COLUMN)
+        return columns
+
+    def __bool__(self):
+        return bool(self.column_values) or self.uses_location
+
+    def mask(self, df):
+        """Return a boolean array that is True for rows kept after all rules."""
+        def value_mask(column, values):
+            if column not in df.columns:
+                self.logger.log_warning(f"Column '{column}' not found in DataFrame, unable to apply exclusion for this column.")
+                return None
+            return self.value_mask(df[column], values)
+
+        has_location = None
+        if LocationHelper.HAS_LOCATION_COLUMN in df.columns:
+            has_location = df[LocationHelper.HAS_LOCATION_COLUMN].to_numpy()
+        return self.combine(value_mask, has_location, len(df))
+
+    def combine(self, value_mask, has_location, row_count):
+        """
+        Combine every rule into one keep mask.
+
+        :param value_mask: Callable (column, values) -> boolean array of rows with a value in values,
+                           or None when the column is unavailable.
+        :param has_location: Integer array, 0 where the row has no usable location, or None.
+        :param row_count: Number of rows.
+        """
+        keep = np.ones(row_count, dtype=bool)
+        for column, values in self.column_values.items():
+            matches = value_mask(column, values)
+            if matches is not None:
+                keep &= ~matches
+
+        if self.uses_location:
+            if has_location is None:
+                self.logger.log_warning("No location data available; no-location rules were not applied.")
+                return keep
+            no_location = has_location == 0
+            if self.no_location_excluded:
+                keep &= ~(no_location & self._any_match(value_mask, self.no_location_excluded, row_count))
+            if self.no_location_included:
+                keep &= ~(no_location & ~self._any_match(value_mask, self.no_location_included, row_count))
+        return keep
+
+    @staticmethod
+    def _any_match(value_mask, rules, row_count):
+        """Rows matching any of the rules' column values."""
+        matches = np.zeros(row_count, dtype=bool)
+        for column, values in rules.items():
+            column_matches = value_mask(column, values)
+            if column_matches is not None:
+                matches |= column_matches
+        return matches
+
+    @staticmethod
+    def value_mask(series, values):
+        """
+        Boolean array of rows whose value is in values, computed on integer codes:
+        the membership test runs once per distinct value, then is gathered per row.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series)
+        return CompiledExclusions.code_mask(codes, uniques, values)
+
+    @staticmethod
+    def code_mask(codes, uniques, values):
+        """Boolean array of codes whose unique value is in values (code -1 never matches)."""
+        lookup = np.append(np.asarray(pd.Index(uniques).isin(list(values))), False)
+        return lookup[codes]
+
+    @classmethod
+    def from_dict(cls, exclusions, logger=None):
+        """Wrap a plain {column: values} exclusions dict."""
+        return cls(column_values=exclusions, logger=logger)
+
+
+class ExclusionCompiler:
+    """Resolves the exclusion settings (IDs from type_group_exclusion.json) to compiled rules."""
+
+    # Settings list -> (report column, description section in type_group_exclusion.json, card-level enable flag)
+    EXCLUSION_LISTS = {
+        "excluded_sr_type": ("Type Description", "type_descriptions", "enable_excluded"),
+        "excluded_group": ("Group Description", "group_descriptions", "enable_excluded"),
+    }
+    NO_LOCATION_EXCLUDED_LISTS = {
+        "no_location_excluded_sr_type": ("Type Description", "type_descriptions", "enable_no_location_excluded"),
+        "no_location_excluded_group": ("Group Description", "group_descriptions", "enable_no_location_excluded"),
+    }
+    NO_LOCATION_INCLUDED_LISTS = {
+        "no_location_included_sr_type": ("Type Description", "type_descriptions", "enable_no_location_included"),
+        "no_location_included_group": ("Group Description", "group_descriptions", "enable_no_location_included"),
+    }
+
+    def __init__(self, logger=None):
+        self.logger = logger if logger else LoggerManager()
+        self._cache_key = None
+        self._compiled = None
+
+    def compile(self, exclusion_settings):
+        """
+        Compile the enabled exclusion lists. The result is cached until the settings
+        or the description JSON change.
+        """
+        json_path = FileHelper.get_json_file_path('type_group_exclusion.json')
+        json_mtime = os.path.getmtime(json_path) if os.path.exists(json_path) else None
+        cache_key = json.dumps([exclusion_settings or {}, json_mtime], sort_keys=True, default=str)
+        if cache_key == self._cache_key:
+            return self._compiled
+
+        descriptions = self._load_descriptions(json_path)
+        self._compiled = CompiledExclusions(
+            self._resolve_lists(exclusion_settings, self.EXCLUSION_LISTS, descriptions),
+            no_location_excluded=self._resolve_lists(exclusion_settings, self.NO_LOCATION_EXCLUDED_LISTS, descriptions),
+            no_location_included=self._resolve_lists(exclusion_settings, self.NO_LOCATION_INCLUDED_LISTS, descriptions),
+            cache_key=cache_key,
+            logger=self.logger,
+        )
+        self._cache_key = cache_key
+        self.logger.log_info(f"Compiled exclusions for columns: {self._compiled.columns}")
+        return self._compiled
+
+    def _resolve_lists(self, exclusion_settings, lists, descriptions):
+        """Resolve the enabled ID lists to {column: descriptions}."""
+        column_values = {}
+        for list_key, (column, section, card_flag) in lists.items():
+            if not self.is_enabled(exclusion_settings, list_key, card_flag):
+                continue
+            values = self._resolve_ids(exclusion_settings.get(list_key, []), descriptions.get(section, {}))
+            if values:
+                column_values.setdefault(column, set()).update(values)
+        return column_values
+
+    @staticmethod
+    def is_enabled(exclusion_settings, list_key, card_flag):
+        """A list applies when its own enable flag or its settings card's enable flag is set."""
+        settings = exclusion_settings or {}
+        return bool(settings.get(f"enable_{list_key}", False) or settings.get(card_flag, False))
+
+    def _load_descriptions(self, json_path):
+        """Load the ID -> description tables."""
+        try:
+            with open(json_path, 'r') as f:
+                return json.load(f) or {}
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.log_error(f"Error loading exclusion descriptions: {e}")
+            return {}
+
+    def _resolve_ids(self, ids, section):
+        """Map IDs to their descriptions, logging IDs that are no longer known."""
+        values = set()
+        for item_id in ids:
+            entry = section.get(str(item_id))
+            if entry is None:
+                self.logger.log_warning(f"Exclusion ID '{item_id}' not found in descriptions; skipping.")
+                continue
+            values.add(entry["description"])
+        return values
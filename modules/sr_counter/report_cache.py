@@ -0,0 +1,73 @@
+import json
+from collections import OrderedDict
+from modules.utils.logger_manager import LoggerManager
+
+
+class ReportCache:
+    """In-process LRU cache of generated reports, bounded by an approximate memory budget."""
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, logger=None):
+        self.max_bytes = max_bytes
+        self.logger = logger if logger else LoggerManager()
+        self._entries = OrderedDict()  # key -> (report DataFrame, included months, size in bytes)
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(fingerprint, selected_columns, start_date, end_date, start_time, end_time, sort_by, exclusions):
+        """Build a hashable key from the dataset fingerprint and the report parameters."""
+        return (
+            fingerprint,
+            tuple(selected_columns),
+            str(start_date), str(end_date),
+            str(start_time), str(end_time),
+            sort_by,
+            ReportCache._exclusions_key(exclusions),
+        )
+
+    @staticmethod
+    def _exclusions_key(exclusions):
+        """Return a canonical string for the exclusion settings."""
+        if not exclusions:
+            return ""
+        if hasattr(exclusions, "cache_key"):
+            return exclusions.cache_key
+        return json.dumps({col: sorted(map(str, values)) for col, values in exclusions.items()}, sort_keys=True)
+
+    def get(self, key):
+        """Return (report copy, included months) for the key, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            self.logger.log_info(f"Report cache miss (hits={self.hits}, misses={self.misses})")
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.logger.log_info(f"Report cache hit (hits={self.hits}, misses={self.misses})")
+        report_df, included_months, _ = entry
+        return report_df.copy(), list(included_months)
+
+    def put(self, key, report_df, included_months):
+        """Store a report, evicting the least recently used entries to stay within the budget."""
+        size = int(report_df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            self.logger.log_debug(f"Report of {size} bytes exceeds the cache budget; not cached.")
+            return
+
+        if key in self._entries:
+            self._total_bytes -= self._entries.pop(key)[2]
+
+        self._entries[key] = (report_df.copy(), list(included_months), size)
+        self._total_bytes += size
+
+        while self._total_bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self._total_bytes -= evicted_size
+            self.logger.log_debug(f"Evicted report from cache ({evicted_size} bytes)")
+
+    def clear(self):
+        """Drop all cached reports."""
+        self._entries.clear()
+        self._total_bytes = 0
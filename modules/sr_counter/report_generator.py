@@ -1,49 +1,100 @@
 import pandas as pd
 from modules.utils.logger_manager import LoggerManager
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QMessageBox, QFileDialog, QLabel
-from PyQt6.QtCore import Qt
+from modules.utils.period_helper import PeriodHelper
+from modules.utils.time_index import TimeIndexHelper
+from modules.utils.dataset_preparer import DatasetPreparer, PreparedDataset
+from modules.utils.date_parser import DateParser
+from modules.sr_counter.crosstab_engine import CrosstabEngine
+from modules.sr_counter.report_cache import ReportCache
+from modules.sr_counter.count_cube import CountCube
+from modules.sr_counter.exclusion_compiler import CompiledExclusions
+from modules.utils.cancel_token import OperationCancelled
+from modules.utils.excel_writer import ExcelReportWriter
 import os
 from datetime import datetime
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Border, Side
 
 
+# Qt is imported inside the dialog methods only, so reports can be generated headless (see cli.py)
 class ReportGenerator:
-    def __init__(self, progress_bar):
+    def __init__(self, progress_bar, use_legacy_grouping=False):
         self.progress_bar = progress_bar
         self.logger = LoggerManager()  # Initialize logger
         self.logger.log_info("ReportGenerator initialized")
         self.included_months = []  # Initialize as an instance variable
         self.grand_totals = {}  # Store grand totals here
+        self.use_legacy_grouping = use_legacy_grouping  # Set True to verify against the per-group loop
+        self.crosstab_engine = CrosstabEngine(self.logger)
+        self.report_cache = ReportCache(logger=self.logger)  # Preview then Generate becomes a lookup
+        self.count_cube = None  # Pre-aggregated counts for the loaded dataset
+        self.count_cube_enabled = True
+        self.date_parser = DateParser(self.logger)  # Parses 'Created Date' of frames not prepared at load
+        self.excel_writer = ExcelReportWriter(self.logger)
+
+    def generate_report(self, df: pd.DataFrame, selected_columns, start_date: datetime, end_date: datetime, start_time=None, end_time=None, sort_by=None, exclusions=None, progress_callback=None):
+        """
+        Generate the report by processing the DataFrame or PreparedDataset.
 
-    def generate_report(self, df: pd.DataFrame, selected_columns, start_date: datetime, end_date: datetime, start_time=None, end_time=None, sort_by=None, exclusions=None):
-        """Generate the report by processing the DataFrame."""
+        progress_callback(percent, message) receives staged progress; it may raise
+        OperationCancelled, which is passed on to the caller.
+        """
         self.logger.log_info(f"Starting report generation from {start_date} to {end_date} with time frame {start_time} to {end_time}")
         self.logger.log_debug(f"Selected columns: {selected_columns}, Sort by: {sort_by}")
 
         try:
-            # Filter dates and times
-            df = self._filter_dates(df, start_date, end_date, start_time, end_time)
-            self.logger.log_debug(f"Row count after date and time filtering: {len(df)}")
-
-            # Ensure the 'Month' column is created
-            if 'Created Date' in df.columns:
-                df = df.copy()  # Avoid SettingWithCopyWarning by working with a copy
-                df.loc[:, 'Month'] = df['Created Date'].dt.month
-                self.logger.log_debug("Month column successfully added to the DataFrame.")
-            else:
-                raise KeyError("'Created Date' column is missing in the DataFrame.")
-
-            # Apply exclusions
-            df = self._apply_exclusions(df, exclusions)
-            self.logger.log_debug(f"Row count after applying exclusions: {len(df)}")
+            self._report_progress(progress_callback, 5, "Preparing report")
+            exclusions = self._compile_exclusions(exclusions)
+            cache_key = None
+            dataset = None
+            if isinstance(df, PreparedDataset):
+                dataset = df
+                if not dataset.has_time and start_time and end_time:
+                    self.logger.log_info("Dataset has dates without times; ignoring the time frame")
+                    start_time = end_time = None
+                # Prepared datasets are immutable, so identical parameters give identical reports
+                if dataset.fingerprint:
+                    cache_key = ReportCache.make_key(dataset.fingerprint, selected_columns, start_date, end_date,
+                                                     start_time, end_time, sort_by, exclusions)
+                    cached = self.report_cache.get(cache_key)
+                    if cached is not None:
+                        combined_report, self.included_months = cached
+                        self._report_progress(progress_callback, 100, "Report ready")
+                        return combined_report
+                df = dataset.frame
 
             # Define the months included
             self.included_months = self._get_month_range(start_date, end_date)[0]  # only keep month names
             self.logger.log_debug(f"Included months for the report: {self.included_months}")
 
-            # Process groups
-            report_data, totals = self._process_groups(df, selected_columns, start_date, end_date)
+            # Answer from the pre-aggregated count cube when the query allows it
+            self._report_progress(progress_callback, 20, "Counting")
+            cube_result = self._query_count_cube(dataset, selected_columns, start_date, end_date, start_time, end_time, exclusions)
+            if cube_result is not None:
+                report_data, totals = cube_result
+            else:
+                # Only carry the columns this run needs; the shared dataset frame is never modified
+                df = self._project_columns(df, selected_columns, exclusions)
+
+                # Filter dates and times
+                self._report_progress(progress_callback, 30, "Filtering")
+                df = self._filter_dates(df, start_date, end_date, start_time, end_time)
+                self.logger.log_debug(f"Row count after date and time filtering: {len(df)}")
+
+                # Period codes are normally derived once at load; derive them here for other callers
+                if 'Created Date' not in df.columns:
+                    raise KeyError("'Created Date' column is missing in the DataFrame.")
+                if PeriodHelper.PERIOD_COLUMN not in df.columns:
+                    df = PeriodHelper.add_period_column(df)
+                    self.logger.log_debug("Period column successfully added to the DataFrame.")
+
+                # Apply exclusions
+                df = self._apply_exclusions(df, exclusions)
+                self.logger.log_debug(f"Row count after applying exclusions: {len(df)}")
+
+                # Process groups
+                self._report_progress(progress_callback, 60, "Counting")
+                report_data, totals = self._process_groups(df, selected_columns, start_date, end_date)
+
+            self._report_progress(progress_callback, 90, "Building report")
             combined_report = self._create_report_dataframe(report_data, selected_columns)
             self.logger.log_debug(f"Row count after processing groups: {len(combined_report)}")
 
@@ -56,8 +107,14 @@ class ReportGenerator:
             combined_report = self._append_totals(combined_report, totals, selected_columns)
             self.logger.log_debug(f"Row count after appending totals (if applied): {len(combined_report)}")
 
+            if cache_key is not None:
+                self.report_cache.put(cache_key, combined_report, self.included_months)
+
+            self._report_progress(progress_callback, 100, "Report ready")
             self.logger.log_info("Report generation completed successfully.")
             return combined_report
+        except OperationCancelled:
+            raise
         except KeyError as ke:
             self.logger.log_error(f"KeyError in report generation: {ke}")
             return None
@@ -67,41 +124,62 @@ class ReportGenerator:
 
 
 
+    def _report_progress(self, progress_callback, percent, message):
+        """Send progress to the callback, or to the progress bar when called without one."""
+        if progress_callback is not None:
+            progress_callback(percent, message)
+        elif self.progress_bar is not None:
+            self.progress_bar.setValue(percent)
+
+    def _project_columns(self, df, selected_columns, exclusions=None):
+        """Select the grouping, exclusion, date and derived key columns needed for a report run."""
+        needed = list(dict.fromkeys(list(selected_columns) + ['Created Date']))
+        if exclusions:
+            needed += [col for col in exclusions.columns if col in df.columns and col not in needed]
+        needed += [col for col in DatasetPreparer.DERIVED_COLUMNS if col in df.columns and col not in needed]
+        return df[needed]
+
     def _filter_dates(self, df, start_date, end_date, start_time=None, end_time=None):
         """
         Filter the DataFrame by the specified date range and optional time frame.
+
+        The date range is a binary-search slice over the sorted epoch column and the
+        time frame compares integer seconds since midnight, so a frame prepared at
+        load time is never re-parsed or scanned. Time frames may wrap past midnight.
         """
         self.logger.log_debug("Filtering data by date range and time frame")
 
-        # Ensure 'Created Date' is a valid datetime
-        df['Created Date'] = pd.to_datetime(df['Created Date'], errors='coerce')
-        df.dropna(subset=['Created Date'], inplace=True)
+        # Frames not prepared by FileLoader get their time keys here (without touching the caller's frame)
+        if not TimeIndexHelper.is_indexed(df):
+            df = df.assign(**{"Created Date": self.date_parser.parse(df["Created Date"])})
+            df = TimeIndexHelper.add_time_keys(df)
 
         # Filter by date range
-        date_filtered_df = df[(df['Created Date'] >= start_date) & (df['Created Date'] <= end_date)]
+        date_filtered_df = TimeIndexHelper.date_slice(df, start_date, end_date)
 
         if start_time and end_time:
             # Filter by time frame
-            date_filtered_df = date_filtered_df[
-                (date_filtered_df['Created Date'].dt.time >= start_time) &
-                (date_filtered_df['Created Date'].dt.time <= end_time)
-            ]
+            seconds = date_filtered_df[TimeIndexHelper.SECONDS_COLUMN].to_numpy()
+            date_filtered_df = date_filtered_df[TimeIndexHelper.time_mask(seconds, start_time, end_time)]
 
         return date_filtered_df
 
 
+    def _compile_exclusions(self, exclusions):
+        """Accept compiled exclusions or a plain {column: values} dict; return None when nothing applies."""
+        if not exclusions:
+            return None
+        if not isinstance(exclusions, CompiledExclusions):
+            exclusions = CompiledExclusions.from_dict(exclusions, logger=self.logger)
+        return exclusions if exclusions else None
+
     def _apply_exclusions(self, df, exclusions):
-        """Apply exclusions to the DataFrame based on the provided exclusion criteria."""
+        """Apply all exclusion rules to the DataFrame in one combined boolean mask."""
         if exclusions:
-            self.logger.log_debug(f"Applying exclusions: {exclusions}")
-            for column, exclude_values in exclusions.items():
-                if column in df.columns:
-                    original_row_count = len(df)
-                    df = df[~df[column].isin(exclude_values)]
-                    excluded_count = original_row_count - len(df)
-                    self.logger.log_debug(f"Excluded {excluded_count} rows from column '{column}' with values: {exclude_values}")
-                else:
-                    self.logger.log_warning(f"Column '{column}' not found in DataFrame, unable to apply exclusion for this column.")
+            self.logger.log_debug(f"Applying exclusions on columns: {exclusions.columns}")
+            original_row_count = len(df)
+            df = df[exclusions.mask(df)]
+            self.logger.log_debug(f"Excluded {original_row_count - len(df)} rows")
         return df
     
     def _append_totals(self, df, totals, selected_columns):
@@ -128,27 +206,71 @@ class ReportGenerator:
 
 
     def _get_month_range(self, start_date, end_date):
-        # Return both month names and month numbers
-        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        month_numbers = list(range(start_date.month, end_date.month + 1))
-        month_names = months[start_date.month - 1:end_date.month]
-        return month_names, month_numbers
+        # Return both month labels ("Jan 2025") and period codes, spanning years if needed
+        period_codes = PeriodHelper.period_range(start_date, end_date)
+        month_names = [PeriodHelper.label(code) for code in period_codes]
+        return month_names, period_codes
 
 
     def _process_groups(self, df, selected_columns, start_date, end_date):
+        """Count rows per group and month, returning the report rows and the grand totals."""
+        if self.use_legacy_grouping:
+            return self._process_groups_legacy(df, selected_columns, start_date, end_date)
+
+        self.logger.log_debug("Processing groups with the crosstab engine")
+        month_names, month_numbers = self._get_month_range(start_date, end_date)
+        keys, counts = self.crosstab_engine.count(df, selected_columns, PeriodHelper.PERIOD_COLUMN, month_numbers)
+        return self._build_report_rows(keys, counts, month_names)
+
+    def _build_report_rows(self, keys, counts, month_names):
+        """Turn group keys and a group x month count matrix into report rows and grand totals."""
+        row_totals = counts.sum(axis=1)
+        combined_data = pd.concat([keys, pd.DataFrame(counts, columns=month_names)], axis=1)
+        combined_data['TOTAL'] = row_totals
+
+        totals = dict(zip(month_names, counts.sum(axis=0).tolist()))
+        totals['TOTAL'] = int(row_totals.sum())
+        return combined_data, totals
+
+    def build_count_cube(self, dataset):
+        """Pre-aggregate the dataset into a count cube so later reports can be answered from it."""
+        if dataset is None or not CountCube.supports_frame(dataset.frame):
+            self.count_cube = None
+            return None
+        self.count_cube = CountCube(self.logger).build(dataset)
+        return self.count_cube
+
+    def _query_count_cube(self, dataset, selected_columns, start_date, end_date, start_time=None, end_time=None, exclusions=None):
+        """Return (report rows, totals) from the count cube, or None when the raw rows are needed."""
+        if dataset is None or self.use_legacy_grouping:
+            return None
+        if self.count_cube is None or self.count_cube.fingerprint != dataset.fingerprint:
+            if not self.count_cube_enabled or self.build_count_cube(dataset) is None:
+                return None
+
+        month_names, month_numbers = self._get_month_range(start_date, end_date)
+        result = self.count_cube.query(dataset, selected_columns, month_numbers, start_date, end_date,
+                                       start_time, end_time, exclusions)
+        if result is None:
+            return None
+
+        self.logger.log_debug("Report answered from the count cube")
+        return self._build_report_rows(*result, month_names)
+
+    def _process_groups_legacy(self, df, selected_columns, start_date, end_date):
         self.logger.log_debug("Processing groups")
         combined_data = []
         month_names, month_numbers = self._get_month_range(start_date, end_date)
         totals = {month: 0 for month in month_names}
         totals['TOTAL'] = 0
 
-        grouped = df.groupby(selected_columns)
+        grouped = df.groupby(selected_columns, observed=True)
         for group_values, group_data in grouped:
             monthly_counts = []
             
-            # Calculate counts for only the included months (now using month numbers)
+            # Calculate counts for only the included months (using period codes)
             for month_number in month_numbers:
-                count = group_data[group_data['Month'] == month_number].shape[0]
+                count = group_data[group_data[PeriodHelper.PERIOD_COLUMN] == month_number].shape[0]
                 monthly_counts.append(count)
 
             # Calculate total for each row
@@ -178,6 +300,8 @@ class ReportGenerator:
         Display the report preview with optional time frame details.
         """
         self.logger.log_info("Displaying report preview")
+        from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QLabel
+        from PyQt6.QtCore import Qt
         try:
             dialog = QDialog()
             dialog.setWindowTitle("Report Preview")
@@ -210,6 +334,8 @@ class ReportGenerator:
 
 
     def _create_preview_dialog(self, df):
+        from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem
+        from PyQt6.QtCore import Qt
         dialog = QDialog()
         dialog.setWindowTitle("Report Preview")
         dialog.setWindowFlag(Qt.WindowType.WindowMaximizeButtonHint)
@@ -236,28 +362,35 @@ class ReportGenerator:
         self.logger.log_info("Saving report to Excel")
 
         try:
-            # Drop empty rows
-            report_df.dropna(how='all', inplace=True)
-
             # Prompt for save location
-            file_path = self._prompt_save_file()
+            file_path = self.prompt_save_file()
             if not file_path:
                 self.logger.log_info("Save canceled by user.")
                 # QMessageBox.warning(None, "Save Canceled", "The report was not saved because the save operation was canceled.")
                 return None
 
             # Save to Excel
-            self._save_to_excel(report_df, file_path, start_time=start_time, end_time=end_time)
+            self.write_report(report_df, file_path, start_time=start_time, end_time=end_time)
             # QMessageBox.information(self, "Success", f"Report saved at {file_path}")
             return file_path
         except Exception as e:
             self.logger.log_error(f"Error saving report: {e}")
+            from PyQt6.QtWidgets import QMessageBox
             QMessageBox.critical(None, "Error", "Failed to save report.")
             return None
 
 
 
-    def _prompt_save_file(self):
+    def write_report(self, report_df, file_path, start_time=None, end_time=None, progress_callback=None):
+        """Write the report to file_path without prompting; safe to run on a worker thread."""
+        # Drop empty rows
+        report_df = report_df.dropna(how='all')
+        self._save_to_excel(report_df, file_path, start_time=start_time, end_time=end_time,
+                            progress_callback=progress_callback)
+        return file_path
+
+    def prompt_save_file(self):
+        from PyQt6.QtWidgets import QFileDialog
         current_time = datetime.now()
         default_filename = current_time.strftime("sr_count_report-%m-%d-%Y-%H-%M-%S.xlsx")
         file_path, _ = QFileDialog.getSaveFileName(
@@ -276,67 +409,26 @@ class ReportGenerator:
 
 
 
-    def _save_to_excel(self, df, file_path, start_time=None, end_time=None):
+    def _save_to_excel(self, df, file_path, start_time=None, end_time=None, progress_callback=None):
         """
         Save the DataFrame to an Excel file with optional time frame details.
+        Errors are logged and re-raised so callers can report them.
 
         :param df: The DataFrame to save.
         :param file_path: The path to save the Excel file.
         :param start_time: Start time for the time frame (if enabled).
         :param end_time: End time for the time frame (if enabled).
+        :param progress_callback: Optional callable(percent, message), called while rows are written.
         """
         self.logger.log_debug("Writing DataFrame to Excel with time frame (if enabled).")
         try:
-            workbook = Workbook()
-            worksheet = workbook.active
-            worksheet.title = 'Report'
-
-            # Define styles
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-            cell_border = Border(left=Side(style='thin'), right=Side(style='thin'),
-                                top=Side(style='thin'), bottom=Side(style='thin'))
-            time_frame_fill = PatternFill(start_color="FFFFCC", end_color="FFFFCC", fill_type="solid")
-            total_fill = PatternFill(start_color="D9EAD3", end_color="D9EAD3", fill_type="solid")
-            total_font = Font(bold=True)
-
-            current_row = 1
-
-            # Add time frame details if applicable
-            if start_time and end_time:
-                time_frame_text = f"Time Frame: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}"
-                worksheet.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(df.columns))
-                time_frame_cell = worksheet.cell(row=current_row, column=1, value=time_frame_text)
-                time_frame_cell.font = Font(bold=True)
-                time_frame_cell.fill = time_frame_fill
-                current_row += 1  # Move to the next row for headers
-
-            # Write headers
-            for col_num, column_title in enumerate(df.columns, start=1):
-                cell = worksheet.cell(row=current_row, column=col_num, value=column_title)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = cell_border
-
-            # Write data rows
-            for row_num, row_data in enumerate(df.itertuples(index=False), start=current_row + 1):
-                is_total_row = row_data[0] == "Totals"
-                for col_num, value in enumerate(row_data, start=1):
-                    cell = worksheet.cell(row=row_num, column=col_num, value=value)
-                    if is_total_row:
-                        cell.font = total_font
-                        cell.fill = total_fill
-                    cell.border = cell_border
-
-            # Autofit column widths safely
-            for col_idx, column_cells in enumerate(worksheet.iter_cols(min_row=current_row, max_row=current_row, max_col=len(df.columns)), start=1):
-                column_letter = column_cells[0].column_letter
-                max_length = max(len(str(cell.value or "")) for cell in worksheet[column_letter]) + 2
-                worksheet.column_dimensions[column_letter].width = max_length
-
-            workbook.save(file_path)
+            self.excel_writer.write(df, file_path, 'Report', banner=ExcelReportWriter.time_frame_banner(start_time, end_time),
+                                    total_marker="Totals", progress_callback=progress_callback, message="Writing report")
             self.logger.log_debug(f"Excel file saved successfully to {file_path}.")
+        except OperationCancelled:
+            raise
         except Exception as e:
             self.logger.log_error(f"Failed to save Excel file: {e}")
+            raise
 
 
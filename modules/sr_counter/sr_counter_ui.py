@@ -5,8 +5,10 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import QDateTime, QTime, Qt
 from modules.utils.logger_manager import LoggerManager
 from modules.utils.app_settings import AppSettings
+from modules.utils.worker import TaskController
 from ..utils.file_loader import FileLoader
 from .report_generator import ReportGenerator
+from .exclusion_compiler import ExclusionCompiler
 from ..utils.checkbox_manager import CheckboxManager
 from .settings_handler import SettingsHandler
 
@@ -25,11 +27,16 @@ class SRCounterUI(QWidget):
         # Setup UI and other components
         self.setup_ui()
 
+        # Background tasks report into the progress bar and stop on Cancel
+        self.tasks = TaskController(self.progress_bar, self.cancel_button, self.logger)
+        self.report_worker = None
+
         # Initialize other components like file loader, report generator, etc.
         self.file_loader = FileLoader(self)
         self.report_generator = ReportGenerator(self.progress_bar)
         self.checkbox_manager = CheckboxManager(self.columns_layout)
         self.settings_handler = SettingsHandler(self)
+        self.exclusion_compiler = ExclusionCompiler(self.logger)
 
         # Variable to track the selected sort column
         self.selected_sort_by = None
@@ -62,6 +69,15 @@ class SRCounterUI(QWidget):
         load_excel_button.setProperty("class", "sidebar-button")  # Apply reusable class
         load_excel_button.clicked.connect(self.load_excel)
 
+        # Load several exports (e.g. one per month) as one dataset
+        load_multiple_button = QPushButton("Load Multiple")
+        load_multiple_button.setProperty("class", "sidebar-button")  # Apply reusable class
+        load_multiple_button.clicked.connect(self.load_multiple)
+
+        load_folder_button = QPushButton("Load Folder")
+        load_folder_button.setProperty("class", "sidebar-button")  # Apply reusable class
+        load_folder_button.clicked.connect(self.load_folder)
+
         # Clear Excel Button
         clear_excel_button = QPushButton("Clear Excel")
         clear_excel_button.setProperty("class", "sidebar-button")  # Apply reusable class
@@ -79,6 +95,8 @@ class SRCounterUI(QWidget):
 
         # Add Buttons
         sidebar_layout.addWidget(load_excel_button)
+        sidebar_layout.addWidget(load_multiple_button)
+        sidebar_layout.addWidget(load_folder_button)
         sidebar_layout.addWidget(clear_excel_button)
         sidebar_layout.addWidget(settings_button)
         sidebar_layout.addStretch(1)
@@ -189,8 +207,12 @@ class SRCounterUI(QWidget):
         generate_button.setProperty("class", "report-button")  # Apply reusable class
         generate_button.clicked.connect(self.generate_report)
 
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setProperty("class", "report-button")  # Apply reusable class
+
         button_layout.addWidget(preview_button)
         button_layout.addWidget(generate_button)
+        button_layout.addWidget(self.cancel_button)
 
         main_panel_layout.addLayout(button_layout)
 
@@ -211,18 +233,23 @@ class SRCounterUI(QWidget):
             self.start_time_input.setTime(QTime(0, 0))
             self.end_time_input.setTime(QTime(23, 59))
 
+    def generate_report(self):
+        """Generate the report based on selected criteria, in the background, then save it."""
+        self.start_report_task(self._save_report, "Failed to generate report.")
 
+    def preview_report(self):
+        """Preview the report based on current settings."""
+        if not self.file_loader.file_paths:
+            QMessageBox.warning(self, "No Data", "Please load a file first.")
+            return
+        self.start_report_task(self._show_preview, "Failed to preview report.")
 
-
-    def validate_time_columns(self):
-        """Validate if time columns exist when time frame is enabled."""
-        if not self.use_time_checkbox.isChecked():
+    def start_report_task(self, on_report, failure_message):
+        """Read the report criteria and build the report on a worker; on_report(report_df, criteria) runs when done."""
+        if self.report_worker is not None:
+            QMessageBox.information(self, "Busy", "A report is already being generated.")
             return
-        if not self.file_loader.validate_time_columns():
-            self.use_time_checkbox.setChecked(False)
 
-    def generate_report(self):
-        """Generate the report based on selected criteria."""
         selected_columns = self.checkbox_manager.get_selected_columns()
         if not selected_columns:
             QMessageBox.warning(self, "Warning", "Please select columns for the report.")
@@ -236,80 +263,111 @@ class SRCounterUI(QWidget):
         start_time = self.start_time_input.time().toPyTime() if self.use_time_checkbox.isChecked() else None
         end_time = self.end_time_input.time().toPyTime() if self.use_time_checkbox.isChecked() else None
 
-        # Validate time range if time frame is enabled
+        # A start time after the end time is a window that wraps past midnight
         if start_time and end_time and start_time > end_time:
-            QMessageBox.critical(self, "Error", "Start Time cannot be after End Time.")
+            self.logger.log_info(f"Time frame {start_time} - {end_time} wraps past midnight")
+
+        criteria = dict(selected_columns=selected_columns, start_date=start_date, end_date=end_date,
+                        start_time=start_time, end_time=end_time, sort_by=self.selected_sort_by,
+                        exclusions=self.get_exclusions())
+        self.report_worker = self.tasks.run(
+            self._build_report, criteria,
+            on_finished=lambda report_df: self._report_done(on_report, report_df, criteria, failure_message),
+            on_error=lambda error: self._task_failed(failure_message, error),
+            on_cancelled=self._report_cancelled,
+        )
+
+    def _build_report(self, worker, criteria):
+        """Worker task: wait for or load the needed columns, then generate the report."""
+        dataset = self.file_loader.ensure_body(criteria["selected_columns"], worker.stage(0, 40, "Loading data"))
+        return self.report_generator.generate_report(
+            dataset, criteria["selected_columns"], criteria["start_date"], criteria["end_date"],
+            criteria["start_time"], criteria["end_time"], sort_by=criteria["sort_by"],
+            exclusions=criteria["exclusions"], progress_callback=worker.stage(40, 100, "Generating report")
+        )
+
+    def _report_done(self, on_report, report_df, criteria, failure_message):
+        self.report_worker = None
+        if report_df is None:
+            QMessageBox.critical(self, "Error", failure_message)
             return
+        on_report(report_df, criteria)
 
-        try:
-            # Generate the report
-            report_df = self.report_generator.generate_report(
-                self.file_loader.df, selected_columns, start_date, end_date, start_time, end_time, sort_by=self.selected_sort_by
-            )
-            if report_df is not None:
-                # Save the report, passing time frame details
-                output_file = self.report_generator.save_report(report_df, start_date, end_date, start_time, end_time)
-                if output_file:  # Alert only after successful save
-                    QMessageBox.information(self, "Success", f"Report saved at {output_file}")
-        except Exception as e:
-            self.logger.log_error(f"Error during report generation: {e}")
-            QMessageBox.critical(self, "Error", "Failed to generate report.")
-
-
+    def _show_preview(self, report_df, criteria):
+        self.report_generator.show_report_preview(report_df)
 
-    def preview_report(self):
-        """Preview the report based on current settings."""
-        if self.file_loader.df is None:
-            QMessageBox.warning(self, "No Data", "Please load a file first.")
+    def _save_report(self, report_df, criteria):
+        """Ask for the save location, then write the report in the background."""
+        file_path = self.report_generator.prompt_save_file()
+        if not file_path:
+            self.logger.log_info("Save canceled by user.")
             return
+        self.tasks.run(
+            self._write_report, report_df, file_path, criteria,
+            on_finished=lambda output_file: QMessageBox.information(self, "Success", f"Report saved at {output_file}"),
+            on_error=lambda error: self._task_failed("Failed to save report.", error),
+        )
+
+    def _write_report(self, worker, report_df, file_path, criteria):
+        """Worker task: write the report workbook."""
+        return self.report_generator.write_report(report_df, file_path, criteria["start_time"], criteria["end_time"],
+                                                  progress_callback=worker.stage(0, 100, "Saving report"))
+
+    def _report_cancelled(self):
+        self.report_worker = None
+        self.progress_bar.setValue(0)
 
-        selected_columns = self.checkbox_manager.get_selected_columns()
-        if not selected_columns:
-            QMessageBox.warning(self, "Warning", "No columns selected for preview.")
-            return
-
-        # Fetch start and end dates
-        start_date = self.start_date_input.dateTime().toPyDateTime()
-        end_date = self.end_date_input.dateTime().toPyDateTime()
-
-        # Fetch start and end times if time frame is enabled
-        start_time = self.start_time_input.time().toPyTime() if self.use_time_checkbox.isChecked() else None
-        end_time = self.end_time_input.time().toPyTime() if self.use_time_checkbox.isChecked() else None
-
-        # Validate time range if time frame is enabled
-        if start_time and end_time and start_time > end_time:
-            QMessageBox.critical(self, "Error", "Start Time cannot be after End Time.")
-            return
+    def _task_failed(self, message, error):
+        self.report_worker = None
+        self.logger.log_error(f"{message} {error}")
+        QMessageBox.critical(self, "Error", message)
 
-        try:
-            # Generate and preview the report
-            report_df = self.report_generator.generate_report(
-                self.file_loader.df, selected_columns, start_date, end_date, start_time, end_time, sort_by=self.selected_sort_by
-            )
-            if report_df is not None:
-                self.report_generator.show_report_preview(report_df)
-        except Exception as e:
-            self.logger.log_error(f"Error during preview: {e}")
-            QMessageBox.critical(self, "Error", "Failed to preview report.")
+    def on_body_read(self, dataset):
+        """Worker thread: build the count cube as soon as the file body is read, ready for the first report."""
+        if self.report_generator.count_cube_enabled:
+            self.report_generator.build_count_cube(dataset)
 
+    def on_load_cancelled(self):
+        """The background file load was cancelled: drop the half-loaded file."""
+        self.clear_excel()
+        self.progress_bar.setValue(0)
+        self.logger.log_info("File load cancelled by user.")
 
     def load_excel(self):
-        """Delegate file loading to FileLoader."""
+        """Delegate file loading to FileLoader; the body and its count cube load in the background."""
         self.file_loader.load_file()
-        if self.file_loader.df is not None:
+        if self.file_loader.file_paths:
+            self.populate_sort_by_dropdown()
+
+    def load_multiple(self):
+        """Load several files chosen together as one dataset."""
+        self.file_loader.load_multiple_files()
+        if self.file_loader.file_paths:
+            self.populate_sort_by_dropdown()
+
+    def load_folder(self):
+        """Load every export in a folder as one dataset."""
+        self.file_loader.load_folder()
+        if self.file_loader.file_paths:
             self.populate_sort_by_dropdown()
 
     def clear_excel(self):
         """Clear the loaded file and reset UI."""
-        self.file_loader.df = None
+        self.file_loader.clear()
+        self.report_generator.build_count_cube(None)
         self.sort_by_dropdown.clear()
         self.checkbox_manager.clear_checkboxes()
 
     def populate_sort_by_dropdown(self):
         """Populate the dropdown with column headers."""
-        if self.file_loader.df is not None:
+        if self.file_loader.header is not None:
             self.sort_by_dropdown.clear()
-            self.sort_by_dropdown.addItems(self.file_loader.df.columns)
+            self.sort_by_dropdown.addItems(self.file_loader.get_display_columns())
+
+    def get_exclusions(self):
+        """Return the saved exclusion settings compiled for the report engine."""
+        self.settings.reload_settings()
+        return self.exclusion_compiler.compile(self.settings.get("exclusions", {}))
 
     def open_settings_dialog(self):
         """Open settings dialog."""
@@ -1,67 +1,168 @@
 import os
+import re
 from datetime import datetime
 import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Border, Side
 from PyQt6.QtWidgets import QFileDialog
 from modules.utils.logger_manager import LoggerManager
+from modules.utils.cancel_token import OperationCancelled
+from modules.utils.excel_writer import ExcelReportWriter, ExcelStreamWriter
+from modules.utils.file_helpers import FileHelper
 
 class SRFormatter:
-    def __init__(self, logger=None):
+    DEFAULT_ROWS_PER_SHEET = 1000000
+    DEFAULT_STREAMING_MIN_MB = 50  # Inputs from this size on are formatted chunk by chunk
+    PREVIEW_ROWS = 500  # Rows per preview page
+    NUMBER_WIDTH = 8  # Digits the numeric part of an SR number is zero-padded to
+
+    # "<prefix>-<number> <description>": the SR number runs to the first space; numbers without
+    # exactly one '-' only match the second alternative and pass through unchanged
+    SR_PATTERN = re.compile(r"^(?P<head>(?P<prefix>[^ -]*)-(?P<number>[^ -]*)(?= |\Z)|[^ ]*)(?: (?P<description>.*))?\Z",
+                            re.DOTALL)
+
+    def __init__(self, logger=None, output_settings=None):
         self.logger = logger if logger else LoggerManager()
+        self.excel_writer = ExcelReportWriter(self.logger)
+
+        # Outputs beyond the row budget are split into numbered sheets or numbered workbooks
+        output_settings = output_settings or {}
+        self.max_rows_per_sheet = int(output_settings.get("max_rows_per_sheet", self.DEFAULT_ROWS_PER_SHEET))
+        self.shard_mode = output_settings.get("shard_mode", "sheets")
+        self.streaming_min_bytes = int(output_settings.get("streaming_min_mb", self.DEFAULT_STREAMING_MIN_MB)) * 1024 * 1024
+        self.chunk_rows = int(output_settings.get("chunk_rows", FileHelper.CSV_CHUNK_ROWS))
 
     def format_sr_data(self, input_file):
-        """Format the SR data and save it to an Excel file."""
+        """Format the SR data and save it to an Excel file; returns the paths written."""
         try:
-            # Load the input file
-            df = pd.read_excel(input_file)
+            # Large inputs are streamed, so the save location is needed before reading
+            if self.should_stream(input_file):
+                file_path = self.prompt_save_path()
+                if not file_path:
+                    self.logger.log_info("Save operation canceled by the user.")
+                    return
+                return self.format_streaming(input_file, file_path)
 
-            # Process the data
-            df = self._process_data(df)
+            # Load and process the input file
+            df = self.load_and_process(input_file)
 
             # Prompt for save location
-            current_time = datetime.now()
-            default_filename = current_time.strftime("formatted_sr_report-%m-%d-%Y-%H-%M-%S.xlsx")
-            file_path, _ = QFileDialog.getSaveFileName(
-                None,
-                "Save Formatted SR Data",
-                default_filename,
-                "Excel Files (*.xlsx)"
-            )
+            file_path = self.prompt_save_path()
             if not file_path:
                 self.logger.log_info("Save operation canceled by the user.")
                 return
 
             # Save the formatted data
-            self._save_to_excel(df, file_path)
-            self.logger.log_info(f"Formatted data saved to {file_path}")
-
-            return file_path
+            return self.save_formatted_data(df, file_path)
         except Exception as e:
             self.logger.log_error(f"Error formatting SR data: {e}")
             raise
 
-    def preview_sr_data(self, input_file, rows=None):
-        """Preview the SR data after formatting, showing the specified number of rows or all rows if not specified."""
+    def prompt_save_path(self):
+        """Ask where to save the formatted data; returns an empty string when canceled."""
+        current_time = datetime.now()
+        default_filename = current_time.strftime("formatted_sr_report-%m-%d-%Y-%H-%M-%S.xlsx")
+        file_path, _ = QFileDialog.getSaveFileName(
+            None,
+            "Save Formatted SR Data",
+            default_filename,
+            "Excel Files (*.xlsx)"
+        )
+        return file_path
+
+    def load_and_process(self, input_file, progress_callback=None):
+        """Load the input file and format it; safe to run on a worker thread."""
+        if progress_callback:
+            progress_callback(0, "Reading file")
+        df = pd.read_excel(input_file)
+
+        if progress_callback:
+            progress_callback(50, "Formatting")
+        df = self._process_data(df)
+
+        if progress_callback:
+            progress_callback(100, "Formatted")
+        return df
+
+    def should_stream(self, input_file):
+        """Whether the input is large enough to be formatted chunk by chunk instead of in memory."""
+        return os.path.getsize(input_file) >= self.streaming_min_bytes
+
+    def format_streaming(self, input_file, file_path, progress_callback=None):
+        """
+        Read the input in chunks, format each chunk and append it to the output as it arrives, so
+        memory stays bounded by the chunk size; safe to run on a worker thread. Returns the paths written.
+        """
+        self.logger.log_info(f"Streaming {input_file} to {file_path} in chunks of {self.chunk_rows} rows.")
+        stream = ExcelStreamWriter(file_path, "Formatted SR Data", max_rows=self.max_rows_per_sheet,
+                                   mode=self.shard_mode, writer=self.excel_writer)
+        reading = None
+        if progress_callback:
+            reading = lambda percent, rows_read: progress_callback(percent * 95 // 100, f"Formatting ({rows_read:,} rows)")
         try:
-            # Load the file
-            df = pd.read_excel(input_file)
+            for chunk in FileHelper.iter_chunks(input_file, self.chunk_rows, reading):
+                stream.append(self._process_data(chunk))
+            file_paths = stream.close()
+        except OperationCancelled:
+            stream.abort()
+            raise
+        except Exception as e:
+            stream.abort()
+            self.logger.log_error(f"Failed to stream formatted data: {e}")
+            raise
 
-            # Process the data
-            df = self._process_data(df)
+        if progress_callback:
+            progress_callback(100, "File saved")
+        self.logger.log_info(f"Formatted data saved to {', '.join(file_paths)}")
+        return file_paths
 
-            # If rows is None, preview the entire file
-            preview_df = df if rows is None else df.head(rows)
+    def save_formatted_data(self, df, file_path, progress_callback=None):
+        """
+        Save formatted data to file_path without prompting; safe to run on a worker thread.
+        Returns the paths written (several when the workbooks shard mode splits the data).
+        """
+        file_paths = self._save_to_excel(df, file_path, progress_callback=progress_callback)
+        self.logger.log_info(f"Formatted data saved to {', '.join(file_paths)}")
+        return file_paths
+
+    def preview_sr_data(self, input_file, rows=None, progress_callback=None):
+        """
+        Preview the SR data after formatting. With rows, only the first rows are read and formatted;
+        without, the whole file is.
+        """
+        try:
+            if rows is None:
+                # Load and process the whole file
+                preview_df = self.load_and_process(input_file, progress_callback)
+            else:
+                pages = self.iter_preview(input_file, rows)
+                try:
+                    preview_df = next(pages)
+                finally:
+                    pages.close()
 
             # Return the preview of the data
             self.logger.log_info("Generating preview for SR data.")
             return preview_df
+        except OperationCancelled:
+            raise
         except Exception as e:
             self.logger.log_error(f"Error generating preview: {e}")
             raise
 
-    def _process_data(self, df):
-        """Process the DataFrame by splitting and formatting the 'SR #' column."""
+    def iter_preview(self, input_file, page_rows=None):
+        """
+        Yield the formatted data a page of page_rows rows at a time. The input is read lazily,
+        so each page costs only its own rows; close() the generator to release the file.
+        """
+        page_rows = page_rows or self.PREVIEW_ROWS
+        for chunk in FileHelper.iter_chunks(input_file, page_rows):
+            yield self._process_data(chunk)
+
+    def _process_data(self, df, vectorized=True):
+        """
+        Process the DataFrame by splitting and formatting the 'SR #' column.
+
+        :param vectorized: Format the whole column at once; False walks the rows (kept for benchmarking).
+        """
         if 'SR #' not in df.columns:
             raise KeyError("'SR #' column is missing in the input file.")
 
@@ -77,7 +178,32 @@ class SRFormatter:
         else:
             description_column = df.columns[sr_column_index + 1]
 
-        # Process each row
+        if vectorized:
+            self._split_sr_column(df, description_column)
+        else:
+            self._split_sr_rows(df, description_column)
+
+        # Reorder columns to ensure SR # and Description are first
+        columns_order = ['SR #', description_column] + [col for col in df.columns if col not in ['SR #', description_column]]
+        return df[columns_order]
+
+    def _split_sr_column(self, df, description_column):
+        """Split and pad every SR number with one regex extraction over the column."""
+        present = df['SR #'].notna()
+        if not present.any():
+            return
+
+        parts = df.loc[present, 'SR #'].astype(str).str.extract(self.SR_PATTERN)
+        padded = parts['prefix'] + '-' + parts['number'].str.zfill(self.NUMBER_WIDTH)
+        sr_numbers = padded.where(parts['number'].notna(), parts['head'])
+
+        for column, values in (('SR #', sr_numbers), (description_column, parts['description'].fillna(''))):
+            if not pd.api.types.is_string_dtype(df[column].dtype):
+                df[column] = df[column].astype(object)  # Numeric columns take the text values as objects
+            df.loc[present, column] = values
+
+    def _split_sr_rows(self, df, description_column):
+        """Split and pad the SR numbers one row at a time."""
         for index, row in df.iterrows():
             if pd.notnull(row['SR #']):
                 # Split the SR # column
@@ -91,10 +217,6 @@ class SRFormatter:
                 # Update the Description column
                 df.at[index, description_column] = description
 
-        # Reorder columns to ensure SR # and Description are first
-        columns_order = ['SR #', description_column] + [col for col in df.columns if col not in ['SR #', description_column]]
-        return df[columns_order]
-
     @staticmethod
     def _add_leading_zeros(sr_number):
         """Add leading zeros to the numeric part of the SR number."""
@@ -105,61 +227,28 @@ class SRFormatter:
         except Exception:
             return sr_number  # Return as-is if parsing fails
 
-    def _save_to_excel(self, df, file_path, start_time=None, end_time=None):
+    def _save_to_excel(self, df, file_path, start_time=None, end_time=None, progress_callback=None):
         """
-        Save the DataFrame to an Excel file with optional time frame details.
+        Save the DataFrame to an Excel file with optional time frame details, sharded at the
+        configured row budget. Errors are logged and re-raised so callers can report them.
 
         :param df: The DataFrame to save.
         :param file_path: The path to save the Excel file.
         :param start_time: Start time for the time frame (if enabled).
         :param end_time: End time for the time frame (if enabled).
+        :param progress_callback: Optional callable(percent, message), called while rows are written.
+        :return: The paths written.
         """
         self.logger.log_debug("Writing DataFrame to Excel with time frame (if enabled).")
         try:
-            workbook = Workbook()
-            worksheet = workbook.active
-            worksheet.title = "Formatted SR Data"
-
-            # Define styles
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-            cell_border = Border(
-                left=Side(style='thin'), right=Side(style='thin'),
-                top=Side(style='thin'), bottom=Side(style='thin')
-            )
-            time_frame_fill = PatternFill(start_color="FFFFCC", end_color="FFFFCC", fill_type="solid")
-
-            current_row = 1
-
-            # Add time frame details if applicable
-            if start_time and end_time:
-                time_frame_text = f"Time Frame: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}"
-                worksheet.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(df.columns))
-                time_frame_cell = worksheet.cell(row=current_row, column=1, value=time_frame_text)
-                time_frame_cell.font = Font(bold=True)
-                time_frame_cell.fill = time_frame_fill
-                current_row += 1  # Move to the next row for headers
-
-            # Write headers
-            for col_num, column_title in enumerate(df.columns, start=1):
-                cell = worksheet.cell(row=current_row, column=col_num, value=column_title)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.border = cell_border
-
-            # Write data rows
-            for row_num, row_data in enumerate(df.itertuples(index=False), start=current_row + 1):
-                for col_num, value in enumerate(row_data, start=1):
-                    cell = worksheet.cell(row=row_num, column=col_num, value=value)
-                    cell.border = cell_border
-
-            # Autofit column widths
-            for col_idx, column_cells in enumerate(worksheet.iter_cols(min_row=1, max_row=worksheet.max_row, max_col=len(df.columns)), start=1):
-                column_letter = column_cells[0].column_letter
-                max_length = max(len(str(cell.value or "")) for cell in column_cells) + 2
-                worksheet.column_dimensions[column_letter].width = max_length
-
-            workbook.save(file_path)
-            self.logger.log_debug(f"Excel file saved successfully to {file_path}")
+            file_paths = self.excel_writer.write_sharded(
+                df, file_path, "Formatted SR Data", max_rows=self.max_rows_per_sheet, mode=self.shard_mode,
+                banner=ExcelReportWriter.time_frame_banner(start_time, end_time),
+                progress_callback=progress_callback)
+            self.logger.log_debug(f"Excel file saved successfully to {', '.join(file_paths)}")
+            return file_paths
+        except OperationCancelled:
+            raise
         except Exception as e:
             self.logger.log_error(f"Failed to save Excel file: {e}")
+            raise
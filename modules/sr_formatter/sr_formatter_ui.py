@@ -1,10 +1,12 @@
 import pandas as pd
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QGroupBox, QPushButton, QLabel, QGridLayout, QHBoxLayout,
-    QMessageBox, QFileDialog, QTableWidget, QTableWidgetItem, QDialog
+    QMessageBox, QFileDialog, QTableWidget, QTableWidgetItem, QDialog, QProgressBar
 )
 from PyQt6.QtCore import Qt
+from modules.utils.app_settings import AppSettings
 from modules.utils.logger_manager import LoggerManager
+from modules.utils.worker import TaskController
 from modules.sr_formatter import SRFormatter
 
 
@@ -17,11 +19,14 @@ class SRFormatterUI(QWidget):
         self.logger = LoggerManager()
 
         # Initialize SRFormatter backend
-        self.sr_formatter = SRFormatter(logger=self.logger)
+        self.sr_formatter = SRFormatter(logger=self.logger, output_settings=AppSettings().get("sr_formatter", {}))
 
         # Setup UI
         self.setup_ui()
 
+        # Background tasks report into the progress bar and stop on Cancel
+        self.tasks = TaskController(self.progress_bar, self.cancel_button, self.logger)
+
         # Variables to store file paths
         self.input_file = None
 
@@ -82,11 +87,21 @@ class SRFormatterUI(QWidget):
         format_button.setProperty("class", "report-button")
         format_button.clicked.connect(self.format_and_save)
 
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setProperty("class", "report-button")
+
         button_layout.addWidget(preview_button)
         button_layout.addWidget(format_button)
+        button_layout.addWidget(self.cancel_button)
+
+        # Progress bar
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setProperty("class", "progress-bar")
+        self.progress_bar.setValue(0)
 
         # Add widgets to the layout
         main_panel_layout.addWidget(self.input_label)
+        main_panel_layout.addWidget(self.progress_bar)
         main_panel_layout.addLayout(button_layout)
 
         formatter_group.setLayout(main_panel_layout)
@@ -105,18 +120,28 @@ class SRFormatterUI(QWidget):
             QMessageBox.warning(self, "No Input File", "Please load an input file first.")
             return
 
+        # Read and format the first page in the background, then display it in a dialog that pages in the rest
+        self.tasks.run(
+            self._preview_task, self.input_file,
+            on_finished=lambda result: self.show_preview_dialog(*result),
+            on_error=self._preview_failed,
+        )
+
+    def _preview_task(self, worker, input_file):
+        pages = self.sr_formatter.iter_preview(input_file)
         try:
-            # Generate preview using SRFormatter
-            df_preview = self.sr_formatter.preview_sr_data(self.input_file)
-
-            # Display the preview in a dialog
-            self.show_preview_dialog(df_preview)
-        except KeyError as ke:
-            self.logger.log_error(f"KeyError during preview: {ke}")
-            QMessageBox.warning(self, "Invalid File", f"Error in the file: {ke}")
-        except Exception as e:
-            self.logger.log_error(f"Error previewing file: {e}")
-            QMessageBox.critical(self, "Error", f"Failed to preview the file. Details:\n{e}")
+            return next(pages, pd.DataFrame()), pages
+        except BaseException:
+            pages.close()
+            raise
+
+    def _preview_failed(self, error):
+        if isinstance(error, KeyError):
+            self.logger.log_error(f"KeyError during preview: {error}")
+            QMessageBox.warning(self, "Invalid File", f"Error in the file: {error}")
+        else:
+            self.logger.log_error(f"Error previewing file: {error}")
+            QMessageBox.critical(self, "Error", f"Failed to preview the file. Details:\n{error}")
 
     def format_and_save(self):
         """Format the SR file and save it."""
@@ -124,16 +149,55 @@ class SRFormatterUI(QWidget):
             QMessageBox.warning(self, "No Input File", "Please load an input file first.")
             return
 
-        try:
-            # Format and save the file using SRFormatter
-            file_path = self.sr_formatter.format_sr_data(self.input_file)
-            QMessageBox.information(self, "Success", f"Formatted data saved to {file_path}")
-        except Exception as e:
-            self.logger.log_error(f"Error formatting and saving file: {e}")
-            QMessageBox.critical(self, "Error", f"Failed to format and save the file. Details:\n{e}")
+        # Large inputs are streamed straight to the save location, chunk by chunk
+        if self.sr_formatter.should_stream(self.input_file):
+            file_path = self.sr_formatter.prompt_save_path()
+            if not file_path:
+                self.logger.log_info("Save operation canceled by the user.")
+                return
+            self.tasks.run(
+                self._stream_task, self.input_file, file_path,
+                on_finished=self._show_saved,
+                on_error=self._format_failed,
+            )
+            return
+
+        # Format in the background, ask for the save location, then save in the background
+        self.tasks.run(
+            self._format_task, self.input_file,
+            on_finished=self._save_formatted,
+            on_error=self._format_failed,
+        )
+
+    def _format_task(self, worker, input_file):
+        return self.sr_formatter.load_and_process(input_file, progress_callback=worker.stage(0, 100, "Formatting"))
 
-    def show_preview_dialog(self, df):
-        """Display a dialog to preview the DataFrame."""
+    def _save_formatted(self, df):
+        file_path = self.sr_formatter.prompt_save_path()
+        if not file_path:
+            self.logger.log_info("Save operation canceled by the user.")
+            return
+        self.tasks.run(
+            self._save_task, df, file_path,
+            on_finished=self._show_saved,
+            on_error=self._format_failed,
+        )
+
+    def _save_task(self, worker, df, file_path):
+        return self.sr_formatter.save_formatted_data(df, file_path, progress_callback=worker.stage(0, 100, "Saving"))
+
+    def _stream_task(self, worker, input_file, file_path):
+        return self.sr_formatter.format_streaming(input_file, file_path, progress_callback=worker.stage(0, 100, "Formatting"))
+
+    def _show_saved(self, saved_paths):
+        QMessageBox.information(self, "Success", "Formatted data saved to " + "\n".join(saved_paths))
+
+    def _format_failed(self, error):
+        self.logger.log_error(f"Error formatting and saving file: {error}")
+        QMessageBox.critical(self, "Error", f"Failed to format and save the file. Details:\n{error}")
+
+    def show_preview_dialog(self, df, pages=None):
+        """Display a dialog to preview the DataFrame; Load More appends the next page from pages."""
         try:
             dialog = QDialog()
             dialog.setWindowTitle("Preview SR Data")
@@ -141,16 +205,47 @@ class SRFormatterUI(QWidget):
 
             layout = QVBoxLayout(dialog)
             table = QTableWidget()
-            table.setRowCount(df.shape[0])
             table.setColumnCount(df.shape[1])
-            table.setHorizontalHeaderLabels(df.columns)
-
-            for i in range(df.shape[0]):
-                for j in range(df.shape[1]):
-                    table.setItem(i, j, QTableWidgetItem(str(df.iloc[i, j])))
-
+            table.setHorizontalHeaderLabels([str(col) for col in df.columns])
             layout.addWidget(table)
+
+            footer = QHBoxLayout()
+            rows_label = QLabel()
+            footer.addWidget(rows_label)
+            load_more_button = QPushButton("Load More")
+            footer.addWidget(load_more_button)
+            layout.addLayout(footer)
+
+            def append_rows(page):
+                start = table.rowCount()
+                table.setRowCount(start + len(page))
+                for i, row_data in enumerate(page.itertuples(index=False, name=None), start=start):
+                    for j, value in enumerate(row_data):
+                        table.setItem(i, j, QTableWidgetItem(str(value)))
+                rows_label.setText(f"Showing {table.rowCount():,} rows")
+
+            def load_more():
+                try:
+                    page = next(pages, None) if pages is not None else None
+                except Exception as e:
+                    self.logger.log_error(f"Error loading more preview rows: {e}")
+                    load_more_button.setEnabled(False)
+                    rows_label.setText(f"Showing {table.rowCount():,} rows (could not load more)")
+                    QMessageBox.critical(dialog, "Error", f"Failed to load more rows. Details:\n{e}")
+                    return
+                if page is None:
+                    load_more_button.setEnabled(False)
+                    rows_label.setText(f"Showing all {table.rowCount():,} rows")
+                else:
+                    append_rows(page)
+
+            append_rows(df)
+            load_more_button.clicked.connect(load_more)
+            load_more_button.setEnabled(pages is not None)
             dialog.setLayout(layout)
             dialog.exec()
         except Exception as e:
             self.logger.log_error(f"Error displaying preview dialog: {e}")
+        finally:
+            if pages is not None:
+                pages.close()  # Release the input file
@@ -1,8 +1,19 @@
-from modules.utils.checkbox_manager import CheckboxManager
-from modules.utils.file_loader import FileLoader
 from modules.utils.file_helpers import FileHelper
 from modules.utils.logger_manager import LoggerManager
 from modules.utils.app_settings import AppSettings
+import importlib
+
+# Qt widgets are imported on first access, so headless tools can use the helpers above
+_QT_EXPORTS = {
+    'CheckboxManager': 'modules.utils.checkbox_manager',
+    'FileLoader': 'modules.utils.file_loader',
+}
 
 # Define what will be accessible when importing utils
 __all__ = ['AppSettings', 'FileHelper', 'LoggerManager','CheckboxManager','FileLoader']
+
+
+def __getattr__(name):
+    if name in _QT_EXPORTS:
+        return getattr(importlib.import_module(_QT_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -77,6 +77,24 @@ class AppSettings:
                 "enable_no_location_excluded_group": False,
                 "enable_no_location_included_sr_type": False,
                 "enable_no_location_included_group": False
+            },
+            "location": {
+                "sentinel_values": [],
+                "bounding_box": None
+            },
+            "dataset_cache": {
+                "enabled": True,
+                "max_size_mb": 2048
+            },
+            "deduplication": {
+                "enabled": True,
+                "keep_latest_by": "Created Date"
+            },
+            "sr_formatter": {
+                "max_rows_per_sheet": 1000000,
+                "shard_mode": "sheets",
+                "streaming_min_mb": 50,
+                "chunk_rows": 100000
             }
         }
         return default
@@ -0,0 +1,25 @@
+import threading
+
+
+class OperationCancelled(Exception):
+    """Raised inside a cancelled operation at its next cancellation check."""
+
+
+class CancelToken:
+    """Cooperative cancellation flag shared between the UI thread and a running operation."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """Ask the operation to stop at its next check."""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Raise OperationCancelled if cancellation was requested."""
+        if self._event.is_set():
+            raise OperationCancelled()
@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+from modules.utils.file_helpers import FileHelper
+from modules.utils.logger_manager import LoggerManager
+from modules.utils.dataset_preparer import PreparedDataset
+
+
+class DatasetCache:
+    """
+    On-disk columnar cache of prepared datasets, keyed by a content hash of the source file
+    plus its size and modification time.
+
+    Every entry is a directory holding one .npy file per column and a manifest.json.
+    Numeric and datetime columns are stored as-is and memory-mapped back in; text and
+    categorical columns are stored as integer codes plus their distinct values.
+    """
+
+    CACHE_VERSION = 6           # Bump when the stored layout or DatasetPreparer output changes
+    SAMPLE_BYTES = 1024 * 1024  # Bytes hashed at the start, middle and end of the source file
+    MANIFEST = "manifest.json"
+
+    def __init__(self, cache_dir=None, max_bytes=2048 * 1024 * 1024, logger=None):
+        self.cache_dir = cache_dir if cache_dir else FileHelper.get_cache_dir_path()
+        self.max_bytes = max_bytes
+        self.logger = logger if logger else LoggerManager()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build the cache from the "dataset_cache" settings, or return None when it is disabled."""
+        settings = settings or {}
+        if not settings.get("enabled", True):
+            return None
+        return cls(max_bytes=int(settings.get("max_size_mb", 2048)) * 1024 * 1024)
+
+    def cache_key(self, file_path, preparer, columns=None):
+        """Hash sampled file content, size and mtime, together with the preparer settings and column projection."""
+        stat = os.stat(file_path)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.CACHE_VERSION}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+        digest.update(json.dumps([preparer.location_settings, preparer.keep_latest_by,
+                                  sorted(columns) if columns is not None else None],
+                                 sort_keys=True, default=str).encode())
+        with open(file_path, 'rb') as f:
+            for offset in (0, stat.st_size // 2, max(stat.st_size - self.SAMPLE_BYTES, 0)):
+                f.seek(offset)
+                digest.update(f.read(self.SAMPLE_BYTES))
+        return digest.hexdigest()
+
+    def load(self, file_path, preparer, columns=None):
+        """Return the cached PreparedDataset for the file (and column projection), or None on a miss."""
+        try:
+            entry_dir = os.path.join(self.cache_dir, self.cache_key(file_path, preparer, columns))
+            manifest_path = os.path.join(entry_dir, self.MANIFEST)
+            if not os.path.exists(manifest_path):
+                self.logger.log_info(f"Dataset cache miss for {os.path.basename(file_path)}")
+                return None
+
+            started = time.perf_counter()
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            columns = {}
+            for i, column in enumerate(manifest["columns"]):
+                columns[i] = self._read_column(entry_dir, i, column)
+            df = pd.DataFrame(columns)
+            df.columns = [column["name"] for column in manifest["columns"]]
+
+            os.utime(manifest_path)  # Mark as recently used for LRU eviction
+            self.logger.log_info(f"Dataset cache hit for {os.path.basename(file_path)}: "
+                                 f"{len(df)} rows in {time.perf_counter() - started:.2f}s")
+            return PreparedDataset(df, manifest["display_columns"], source_path=file_path,
+                                   fingerprint=preparer.fingerprint(df, file_path),
+                                   duplicates_dropped=manifest.get("duplicates_dropped", 0),
+                                   has_time=manifest.get("has_time", True),
+                                   unparseable_dates=manifest.get("unparseable_dates", 0))
+        except Exception as e:
+            self.logger.log_warning(f"Could not read dataset cache for {file_path}: {e}")
+            return None
+
+    def store(self, file_path, dataset, preparer, columns=None):
+        """Write the prepared dataset to the cache, then evict old entries beyond the size cap."""
+        entry_dir = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            key = self.cache_key(file_path, preparer, columns)
+            entry_dir = os.path.join(self.cache_dir, key)
+            temp_dir = f"{entry_dir}.tmp{os.getpid()}"
+            os.makedirs(temp_dir, exist_ok=True)
+
+            df = dataset.frame
+            manifest = {
+                "version": self.CACHE_VERSION,
+                "source": os.path.abspath(file_path),
+                "display_columns": dataset.display_columns,
+                "duplicates_dropped": dataset.duplicates_dropped,
+                "has_time": dataset.has_time,
+                "unparseable_dates": dataset.unparseable_dates,
+                "columns": [self._write_column(temp_dir, i, df.iloc[:, i]) for i in range(df.shape[1])],
+            }
+            with open(os.path.join(temp_dir, self.MANIFEST), 'w') as f:
+                json.dump(manifest, f)
+
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(temp_dir, entry_dir)
+            self.logger.log_info(f"Cached dataset for {os.path.basename(file_path)} ({self._entry_size(entry_dir)} bytes)")
+        except Exception as e:
+            self.logger.log_warning(f"Could not cache dataset for {file_path}: {e}")
+            if entry_dir:
+                shutil.rmtree(f"{entry_dir}.tmp{os.getpid()}", ignore_errors=True)
+            return
+
+        self.evict(keep=key)
+
+    def _write_column(self, entry_dir, index, series):
+        """Store one column and return its manifest entry."""
+        column = {"name": series.name, "dtype": str(series.dtype)}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            column["encoding"] = "category"
+            column["ordered"] = bool(series.cat.ordered)
+            codes, uniques = series.cat.codes.to_numpy(), series.cat.categories
+        elif isinstance(series.dtype, np.dtype) and series.dtype.kind != 'O':
+            column["encoding"] = "plain"
+            np.save(os.path.join(entry_dir, f"col_{index}.npy"), series.to_numpy())
+            return column
+        else:
+            column["encoding"] = "dictionary"
+            codes, uniques = pd.factorize(series)
+
+        np.save(os.path.join(entry_dir, f"col_{index}.npy"), np.asarray(codes, dtype=np.int32))
+        np.save(os.path.join(entry_dir, f"col_{index}_values.npy"), np.asarray(uniques, dtype=object),
+                allow_pickle=True)
+        return column
+
+    def _read_column(self, entry_dir, index, column):
+        """Rebuild one column from its stored arrays."""
+        values = np.load(os.path.join(entry_dir, f"col_{index}.npy"), mmap_mode='r')
+        if column["encoding"] == "plain":
+            return pd.Series(values)
+
+        uniques = np.load(os.path.join(entry_dir, f"col_{index}_values.npy"), allow_pickle=True)
+        if column["encoding"] == "category":
+            return pd.Series(pd.Categorical.from_codes(values, categories=pd.Index(uniques), ordered=column["ordered"]))
+
+        # Code -1 marks a missing value
+        restored = np.append(uniques, np.nan)[values]
+        series = pd.Series(restored, dtype=object)
+        return series if column["dtype"] == "object" else series.astype(column["dtype"])
+
+    def evict(self, keep=None):
+        """Remove the least recently used entries until the cache fits within max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+            manifest_path = os.path.join(self.cache_dir, name, self.MANIFEST)
+            if os.path.exists(manifest_path):
+                entries.append((os.path.getmtime(manifest_path), name, self._entry_size(os.path.join(self.cache_dir, name))))
+
+        total = sum(size for _, _, size in entries)
+        for _, name, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            total -= size
+            self.logger.log_debug(f"Evicted cached dataset {name} ({size} bytes)")
+
+    def clear(self):
+        """Remove every cached dataset."""
+        if os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.logger.log_info("Dataset cache cleared")
+
+    @staticmethod
+    def _entry_size(entry_dir):
+        return sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file())
@@ -0,0 +1,118 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from modules.utils.file_helpers import FileHelper
+from modules.utils.dataset_preparer import DatasetPreparer, read_mapped_file
+from modules.utils.dataset_cache import DatasetCache
+from modules.utils.app_settings import AppSettings
+from modules.utils.logger_manager import LoggerManager
+
+
+class DatasetLoader:
+    """
+    Reads one or more exports into a PreparedDataset, through the dataset cache when possible.
+    Qt-free, so it is shared by FileLoader and the command-line tools.
+    """
+
+    # Columns every report run reads; the SR numbers are read for deduplication and kept only when requested
+    BASE_COLUMNS = ["Created Date", "Type Description", "Group Description", "X Value", "Y Value"]
+    # File types picked up when loading several files or a folder
+    SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv')
+
+    def __init__(self, preparer=None, dataset_cache=None, logger=None):
+        self.logger = logger if logger else LoggerManager()
+        self.preparer = preparer if preparer else DatasetPreparer(self.logger)
+        self.dataset_cache = dataset_cache  # None disables the dataset cache
+        self.file_stats = []  # (file name, rows, seconds) of the last multi-file load
+
+    @classmethod
+    def from_settings(cls, settings=None, use_cache=True):
+        """Build a loader from the saved location, deduplication and dataset cache settings."""
+        settings = settings if settings else AppSettings()
+        preparer = DatasetPreparer(location_settings=settings.get("location", {}),
+                                   dedup_settings=settings.get("deduplication", {}))
+        dataset_cache = DatasetCache.from_settings(settings.get("dataset_cache", {})) if use_cache else None
+        return cls(preparer, dataset_cache)
+
+    @staticmethod
+    def list_folder(folder):
+        """The supported exports in a folder, sorted by name (Excel lock files skipped)."""
+        return sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if name.lower().endswith(DatasetLoader.SUPPORTED_EXTENSIONS) and not name.startswith('~$')
+        )
+
+    @staticmethod
+    def expand_paths(paths):
+        """Replace folders in paths with the exports they hold."""
+        file_paths = []
+        for path in paths:
+            file_paths += DatasetLoader.list_folder(path) if os.path.isdir(path) else [path]
+        return file_paths
+
+    def read_dataset(self, file_paths, columns=None, progress_callback=None):
+        """
+        Return the prepared dataset for one or more files (limited to columns, if given).
+        A single file comes from the dataset cache when it is unchanged, otherwise it is read,
+        prepared and cached. Several files are read in parallel and prepared as one dataset.
+        'Service Request Number' is kept as text only when columns asks for it (or is None).
+        Returns None if unreadable.
+        """
+        keep_sr_numbers = columns is None or "Service Request Number" in columns
+        read_columns = self.preparer.read_columns(columns)
+        if len(file_paths) > 1:
+            df, date_only = self.read_many(file_paths, read_columns, progress_callback)
+            return self.preparer.prepare(df, source_path=file_paths, date_only=date_only,
+                                         keep_sr_numbers=keep_sr_numbers)
+
+        file_path = file_paths[0]
+        if self.dataset_cache:
+            dataset = self.dataset_cache.load(file_path, self.preparer, columns)
+            if dataset is not None:
+                return dataset
+
+        # Use FileHelper to stream the file with the column projection and dtype plan
+        usecols, dtype = self.preparer.read_plan(read_columns)
+        df = FileHelper.read_file(file_path, usecols=usecols, dtype=dtype, chunksize=FileHelper.CSV_CHUNK_ROWS,
+                                  progress_callback=progress_callback)
+        if df is None:
+            return None
+
+        # Normalize once: map columns, parse dates and derive the report keys
+        dataset = self.preparer.prepare(df, source_path=file_path, keep_sr_numbers=keep_sr_numbers)
+        if self.dataset_cache:
+            self.dataset_cache.store(file_path, dataset, self.preparer, columns)
+        return dataset
+
+    def read_many(self, file_paths, columns=None, progress_callback=None):
+        """
+        Read and column-map several files in a process pool and concatenate them in file order.
+        Per-file row counts and timings are logged and kept in file_stats.
+
+        :return: Tuple of (DataFrame, whether any file exports dates without times).
+        """
+        started = time.perf_counter()
+        frames = {}
+        date_only = False
+        self.file_stats = []
+        pool = ProcessPoolExecutor(max_workers=min(len(file_paths), os.cpu_count() or 1))
+        try:
+            futures = {pool.submit(read_mapped_file, file_path, columns): file_path for file_path in file_paths}
+            for done, future in enumerate(as_completed(futures), start=1):
+                file_path = futures[future]
+                df, file_date_only, seconds = future.result()
+                if df is None:
+                    raise ValueError(f"The file could not be read: {os.path.basename(file_path)}")
+                frames[file_path] = df
+                date_only |= file_date_only
+                self.file_stats.append((os.path.basename(file_path), len(df), seconds))
+                self.logger.log_info(f"Loaded {os.path.basename(file_path)}: {len(df)} rows in {seconds:.2f}s")
+                if progress_callback:
+                    progress_callback(done * 100 // len(file_paths), sum(len(frame) for frame in frames.values()))
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)  # Cancelled loads do not wait for queued files
+
+        df = FileHelper.concat_chunks([frames[file_path] for file_path in file_paths])
+        self.logger.log_info(f"Loaded {len(file_paths)} files ({len(df)} rows) in {time.perf_counter() - started:.2f}s; "
+                             f"slowest file {max(seconds for _, _, seconds in self.file_stats):.2f}s")
+        return df, date_only
@@ -0,0 +1,302 @@
+import hashlib
+import os
+import time
+import numpy as np
+import pandas as pd
+from modules.utils.file_helpers import FileHelper
+from modules.utils.logger_manager import LoggerManager
+from modules.utils.period_helper import PeriodHelper
+from modules.utils.time_index import TimeIndexHelper
+from modules.utils.location_helper import LocationHelper
+from modules.utils.sr_numbers import SRNumberHelper
+from modules.utils.date_parser import DateParser
+
+
+class PreparedDataset:
+    """Immutable, report-ready view of a loaded export."""
+
+    def __init__(self, frame, display_columns, source_path=None, fingerprint=None, duplicates_dropped=0,
+                 has_time=True, unparseable_dates=0):
+        self._frame = frame
+        self._display_columns = list(display_columns)
+        self.source_path = source_path
+        self.fingerprint = fingerprint  # Identifies the dataset contents for result caching
+        self.duplicates_dropped = duplicates_dropped  # Repeated service requests removed while preparing
+        self.has_time = has_time  # False for date-only exports, where time frames do not apply
+        self.unparseable_dates = unparseable_dates  # 'Created Date' values that could not be read
+
+    @property
+    def frame(self):
+        """The normalized DataFrame, sorted by 'Created Date' with derived key columns."""
+        return self._frame
+
+    @property
+    def display_columns(self):
+        """Column names shown to the user (derived key columns excluded)."""
+        return list(self._display_columns)
+
+    def __len__(self):
+        return len(self._frame)
+
+
+class DatasetPreparer:
+    """
+    Normalizes a freshly read export once so report runs never re-parse it. Every step returns
+    a new frame (assign, rename, boolean selection), so the preparer never mutates its input
+    and works the same with or without pandas copy-on-write.
+    """
+
+    # Known columns with alternative names, mapped to user-friendly names
+    COLUMN_ALIASES = {
+        "Service Request Number": ["Service Request Number", "Service_Re", "SR #"],
+        "Created Date": ["Created Date", "Created_Da", "Created Date Only"],
+        "Type Description": ["Type Description", "Type_Descr"],
+        "Group Description": ["Group Description", "Group_Desc"],
+        "X Value": ["X Value", "X_Value"],
+        "Y Value": ["Y Value", "Y_Value"]
+    }
+
+    # dtypes applied while reading the known columns (see read_plan)
+    READ_DTYPES = {
+        "Type Description": "category",
+        "Group Description": "category",
+    }
+
+    # Memory plan applied after preparation (see optimize_dtypes)
+    CATEGORY_MAX_RATIO = 0.5  # Text columns with at most this share of distinct values become categoricals
+    FLOAT32_COLUMNS = ["X Value", "Y Value"]
+    SAMPLE_ROWS = 10000  # Rows sampled to estimate text cardinality and memory
+
+    # Columns derived for the report engine; hidden from the UI
+    DERIVED_COLUMNS = [PeriodHelper.PERIOD_COLUMN, TimeIndexHelper.EPOCH_COLUMN, TimeIndexHelper.SECONDS_COLUMN,
+                       LocationHelper.HAS_LOCATION_COLUMN, SRNumberHelper.KEY_COLUMN]
+
+    def __init__(self, logger=None, location_settings=None, dedup_settings=None):
+        self.logger = logger if logger else LoggerManager()
+        # Optional "sentinel_values" and "bounding_box" used to classify unusable locations
+        self.location_settings = location_settings or {}
+        # Optional "enabled" and "keep_latest_by" (the column whose latest value wins among duplicates)
+        self.dedup_settings = dedup_settings or {}
+        self.date_parser = DateParser(self.logger)
+
+    @property
+    def keep_latest_by(self):
+        """Column deciding which duplicate service request is kept, or None when deduplication is off."""
+        if not self.dedup_settings.get("enabled", True):
+            return None
+        return self.dedup_settings.get("keep_latest_by", "Created Date")
+
+    def prepare(self, df, source_path=None, date_only=None, keep_sr_numbers=True):
+        """
+        Build a PreparedDataset from a raw DataFrame.
+
+        :param df: The DataFrame as read from the file.
+        :param source_path: Path of the file the data came from, if any.
+        :param date_only: Whether the dates carry no time of day; detected from the column names when None.
+        :param keep_sr_numbers: Whether to keep the 'Service Request Number' text next to its int64 keys;
+                                only needed when a report groups or filters by it.
+        :return: PreparedDataset sorted by 'Created Date' with period, time and location keys.
+        """
+        if date_only is None:
+            date_only = DateParser.is_date_only(df.columns)
+        df = self.map_columns(df)
+        df = self.drop_unused_columns(df)
+
+        unparseable_dates = 0
+        if "Created Date" in df.columns:
+            df = df.assign(**{"Created Date": self.date_parser.parse(df["Created Date"])})
+            unparseable_dates = self.date_parser.last_unparseable
+        if "Service Request Number" in df.columns:
+            df = df.assign(**{SRNumberHelper.KEY_COLUMN: SRNumberHelper.normalized_keys(df["Service Request Number"])})
+        df, duplicates_dropped = self.deduplicate(df)
+        if not keep_sr_numbers and "Service Request Number" in df.columns:
+            df = df.drop(columns="Service Request Number")  # The int64 keys identify the requests from here on
+
+        has_time = False
+        if "Created Date" in df.columns:
+            df = TimeIndexHelper.add_time_keys(df)
+            df = PeriodHelper.add_period_column(df)
+            # Dates that all fall on midnight carry no time of day either
+            has_time = not date_only and bool((df[TimeIndexHelper.SECONDS_COLUMN].to_numpy() > 0).any())
+        else:
+            self.logger.log_warning("'Created Date' column not found; dataset prepared without time keys.")
+
+        if "X Value" in df.columns and "Y Value" in df.columns:
+            df = LocationHelper.add_location_column(
+                df,
+                sentinel_values=self.location_settings.get("sentinel_values"),
+                bounding_box=self.location_settings.get("bounding_box"),
+            )
+
+        df = self.optimize_dtypes(df)
+
+        display_columns = [col for col in df.columns if col not in self.DERIVED_COLUMNS]
+        self.logger.log_info(f"Prepared dataset with {len(df)} rows and {len(display_columns)} columns")
+        return PreparedDataset(df, display_columns, source_path=source_path,
+                               fingerprint=self.fingerprint(df, source_path), duplicates_dropped=duplicates_dropped,
+                               has_time=has_time, unparseable_dates=unparseable_dates)
+
+    def deduplicate(self, df):
+        """
+        Drop repeated service requests (e.g. from overlapping monthly exports), keeping the row
+        with the latest keep_latest_by value; ties keep the row read last. SR numbers are
+        compared on their normalized int64 keys (the SR Key column added by prepare), so
+        'SR-123' and 'SR-00000123' are one request.
+
+        :return: Tuple of (DataFrame, number of rows dropped).
+        """
+        keep_by = self.keep_latest_by
+        if keep_by is None or SRNumberHelper.KEY_COLUMN not in df.columns or len(df) == 0:
+            return df, 0
+        if keep_by not in df.columns:
+            self.logger.log_warning(f"Deduplication column '{keep_by}' not found; keeping the last row read.")
+
+        keys = df[SRNumberHelper.KEY_COLUMN].to_numpy()
+        order = np.arange(len(df))
+        if keep_by in df.columns:
+            # Missing values sort first so any dated row wins over an undated one
+            order = df[keep_by].reset_index(drop=True).sort_values(kind='stable', na_position='first').index.to_numpy()
+
+        sorted_keys = keys[order]
+        duplicate = np.zeros(len(df), dtype=bool)
+        duplicate[order] = pd.Series(sorted_keys).duplicated(keep='last').to_numpy() & (sorted_keys != SRNumberHelper.MISSING)
+
+        dropped = int(duplicate.sum())
+        if dropped:
+            df = df[~duplicate]
+        self.logger.log_info(f"Deduplication dropped {dropped} repeated service requests (kept latest by '{keep_by}')")
+        return df, dropped
+
+    def optimize_dtypes(self, df):
+        """
+        Shrink the frame: repeated text columns become categoricals, coordinates become float32
+        (after locations were classified at full precision).
+        Logs the memory footprint before and after.
+        """
+        before = self.memory_bytes(df)
+        changes = {}
+        for col in df.columns:
+            if col in self.DERIVED_COLUMNS or col in ("Created Date", "Service Request Number"):
+                continue
+            series = df[col]
+            if col in self.FLOAT32_COLUMNS and series.dtype == np.float64:
+                changes[col] = series.astype(np.float32)
+            elif self._is_repeated_text(series):
+                changes[col] = series.astype("category")
+
+        df = df.assign(**changes)
+        after = self.memory_bytes(df)
+        self.logger.log_info(f"Dataset memory: {before / 2**20:.1f} MB -> {after / 2**20:.1f} MB "
+                             f"(converted {sorted(col for col in changes if col in df.columns)})")
+        return df
+
+    def _is_repeated_text(self, series):
+        """Whether a column holds only text with few distinct values relative to its length."""
+        if len(series) == 0 or isinstance(series.dtype, pd.CategoricalDtype):
+            return False
+        if not (series.dtype == object or pd.api.types.is_string_dtype(series.dtype)):
+            return False
+        # Rule out mostly unique columns (addresses, comments) on a sample before counting them fully
+        sample = series.iloc[:self.SAMPLE_ROWS]
+        if sample.nunique(dropna=True) > self.CATEGORY_MAX_RATIO * len(sample):
+            return False
+        if pd.api.types.infer_dtype(series, skipna=True) != "string":
+            return False
+        return series.nunique(dropna=True) <= self.CATEGORY_MAX_RATIO * len(series)
+
+    def memory_bytes(self, df):
+        """Approximate deep memory usage; text columns are measured on an evenly spaced sample."""
+        if len(df) == 0:
+            return 0
+        shallow = df.memory_usage(index=False).to_numpy()
+        sample = df.iloc[::max(len(df) // self.SAMPLE_ROWS, 1)]
+        sampled = sample.memory_usage(index=False, deep=True).to_numpy() * (len(df) / len(sample))
+        is_text = [dtype == object or pd.api.types.is_string_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype)
+                   for dtype in df.dtypes]
+        return int(np.where(is_text, sampled, shallow).sum())
+
+    def fingerprint(self, df, source_path=None):
+        """
+        Hash the source file identity, the shape and columns, and the sorted epoch keys.
+        Computed once per load, so it stays cheap even for multi-million row exports.
+        source_path may be one path or a list of paths for datasets combined from several files.
+        Data without a source file has its full contents hashed instead.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{df.shape}|{list(df.columns)}".encode())
+        source_paths = [source_path] if isinstance(source_path, str) else list(source_path or [])
+        if source_paths and all(os.path.exists(path) for path in source_paths):
+            for path in source_paths:
+                stat = os.stat(path)
+                digest.update(f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+            if TimeIndexHelper.EPOCH_COLUMN in df.columns:
+                digest.update(df[TimeIndexHelper.EPOCH_COLUMN].to_numpy().tobytes())
+        else:
+            digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def read_columns(self, columns=None):
+        """The columns to read for the requested ones: deduplication also needs the SR numbers."""
+        if columns is None or self.keep_latest_by is None:
+            return columns
+        return list(dict.fromkeys(list(columns) + ["Service Request Number"]))
+
+    def read_plan(self, columns=None):
+        """
+        Column projection and dtype plan for FileHelper readers, expressed over every alias
+        of the known columns.
+
+        :param columns: Friendly column names to read, or None to read every column.
+        :return: Tuple of (usecols, dtype) for FileHelper.read_file.
+        """
+        dtype = {
+            alias: self.READ_DTYPES[name]
+            for name, options in self.COLUMN_ALIASES.items() if name in self.READ_DTYPES
+            for alias in options
+        }
+
+        usecols = None
+        if columns is not None:
+            wanted = set(columns)
+            for name in columns:
+                wanted.update(self.COLUMN_ALIASES.get(name, []))
+            usecols = wanted.__contains__
+        return usecols, dtype
+
+    def map_columns(self, df):
+        """Map known columns with alternative names to user-friendly names."""
+        for friendly_name, options in self.COLUMN_ALIASES.items():
+            for option in options:
+                if option in df.columns:
+                    df = df.rename(columns={option: friendly_name})
+                    break  # Stop renaming once a match is found
+        return df
+
+    def drop_unused_columns(self, df):
+        """Drop columns that hold no values at all, such as blank trailing export columns."""
+        empty_columns = [
+            col for col, has_values in df.notna().any().items()
+            if not has_values and col not in self.COLUMN_ALIASES
+        ]
+        if empty_columns:
+            self.logger.log_debug(f"Dropping empty columns: {empty_columns}")
+            df = df.drop(columns=empty_columns)
+        return df
+
+
+def read_mapped_file(file_path, columns=None):
+    """
+    Read one export with the DatasetPreparer column plan and map its column names.
+    Module-level so it can run in worker processes when several files are loaded.
+
+    :return: Tuple of (DataFrame or None, whether it exports dates without times, seconds taken).
+    """
+    started = time.perf_counter()
+    preparer = DatasetPreparer()
+    usecols, dtype = preparer.read_plan(columns)
+    df = FileHelper.read_file(file_path, usecols=usecols, dtype=dtype, chunksize=FileHelper.CSV_CHUNK_ROWS)
+    date_only = False
+    if df is not None:
+        date_only = DateParser.is_date_only(df.columns)
+        df = preparer.map_columns(df)
+    return df, date_only, time.perf_counter() - started
@@ -0,0 +1,111 @@
+import weakref
+import pandas as pd
+from modules.utils.logger_manager import LoggerManager
+
+
+class DateParser:
+    """
+    Parses date columns once with an exact format inferred from a sample of the values,
+    instead of pandas' per-element inference; only values that format misses are inferred
+    one by one. Parsed columns are cached by column identity,
+    so repeated checks on the same loaded column never parse it again.
+    """
+
+    # Tried in order against the sample; the first format parsing the most values wins
+    DATE_FORMATS = [
+        "ISO8601",
+        "%m/%d/%Y %I:%M:%S %p", "%m/%d/%Y %I:%M %p", "%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y",
+        "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y",
+        "%Y/%m/%d %H:%M:%S", "%Y/%m/%d",
+        "%d-%b-%Y %H:%M:%S", "%d-%b-%Y",
+    ]
+    DATE_ONLY_COLUMNS = ["Created Date Only"]  # Export columns holding dates without a time of day
+    SAMPLE_ROWS = 1000
+    MIN_MATCH_RATIO = 0.9  # Below this share of parsed sample values, fall back to pandas inference
+    CACHE_SIZE = 8
+
+    def __init__(self, logger=None):
+        self.logger = logger if logger else LoggerManager()
+        self._cache = {}  # id(column values) -> (weakref to the values, parsed Series, format, unparseable count)
+        self.last_format = None  # Format used by the last parse (None when pandas inferred it)
+        self.last_unparseable = 0  # Non-blank values the last parse could not read
+
+    def parse(self, series):
+        """
+        Return the series as datetime64 values, NaT where a value could not be parsed.
+        Unparseable values are counted in last_unparseable and logged with a few examples.
+        """
+        if pd.api.types.is_datetime64_any_dtype(series.dtype):
+            self.last_format, self.last_unparseable = None, 0
+            return series
+
+        values = series.values
+        cached = self._cache.get(id(values))
+        if cached is not None and cached[0]() is values:
+            _, parsed, self.last_format, self.last_unparseable = cached
+            return parsed
+
+        date_format = self.infer_format(series)
+        if date_format is not None:
+            parsed = pd.to_datetime(series, format=date_format, errors="coerce")
+        else:
+            parsed = pd.to_datetime(series, errors="coerce")
+
+        # Values the column's format missed, e.g. a few ISO dates in a US-format export, are parsed one by one
+        leftover = parsed.isna().to_numpy() & self._has_value(series)
+        if leftover.any():
+            parsed = parsed.copy()
+            parsed[leftover] = pd.to_datetime(series[leftover], errors="coerce", format="mixed")
+
+        unparseable = parsed.isna().to_numpy() & self._has_value(series)
+        self.last_format, self.last_unparseable = date_format, int(unparseable.sum())
+        if self.last_unparseable:
+            examples = series[unparseable].head(3).tolist()
+            self.logger.log_warning(f"{self.last_unparseable} of {len(series)} '{series.name}' values could not be "
+                                    f"parsed as dates (format {date_format or 'inferred'}), e.g. {examples}")
+        self._remember(values, parsed)
+        return parsed
+
+    def infer_format(self, series):
+        """Return the DATE_FORMATS entry matching the sampled text values best, or None if none fits."""
+        sample = series.dropna().iloc[:self.SAMPLE_ROWS]
+        sample = sample[sample.map(type) == str] if sample.dtype == object else sample
+        sample = sample.astype(str).str.strip()
+        sample = sample[sample != ""]
+        if sample.empty:
+            return None
+
+        best_format, best_count = None, 0
+        for date_format in self.DATE_FORMATS:
+            count = int(pd.to_datetime(sample, format=date_format, errors="coerce").notna().sum())
+            if count > best_count:
+                best_format, best_count = date_format, count
+            if count == len(sample):
+                break
+
+        if best_count < self.MIN_MATCH_RATIO * len(sample):
+            self.logger.log_warning(f"No single date format fits '{series.name}'; falling back to per-value parsing.")
+            return None
+        self.logger.log_debug(f"Inferred date format {best_format} for '{series.name}'")
+        return best_format
+
+    @staticmethod
+    def is_date_only(columns):
+        """Whether the columns name a date-only export column such as 'Created Date Only'."""
+        return any(col in columns for col in DateParser.DATE_ONLY_COLUMNS)
+
+    @staticmethod
+    def _has_value(series):
+        """Rows holding a non-blank value."""
+        return series.notna().to_numpy() & ~series.isin([""]).to_numpy()
+
+    def _remember(self, values, parsed):
+        """Cache a parsed column, dropping entries whose column no longer exists."""
+        try:
+            ref = weakref.ref(values)
+        except TypeError:
+            return  # Values that cannot be weakly referenced are not cached
+        self._cache = {key: entry for key, entry in self._cache.items() if entry[0]() is not None}
+        if len(self._cache) >= self.CACHE_SIZE:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[id(values)] = (ref, parsed, self.last_format, self.last_unparseable)
@@ -0,0 +1,291 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+from modules.utils.column_autofit import ColumnAutofit
+from modules.utils.logger_manager import LoggerManager
+
+
+class ExcelReportWriter:
+    """
+    Streams DataFrames into write-only workbooks. Rows are serialized as they are appended,
+    so memory stays flat regardless of the row count, and every cell role (header, body,
+    totals, time frame banner) uses one registered named style instead of per-cell
+    Font/PatternFill/Border objects.
+    """
+
+    HEADER_STYLE = "report_header"
+    BODY_STYLE = "report_body"
+    TOTAL_STYLE = "report_total"
+    BANNER_STYLE = "report_banner"
+    PROGRESS_ROWS = 1000  # Rows written between progress updates
+    MAX_SHEET_ROWS = 1048576  # Excel's row limit per sheet, banner and header included
+    MAX_SHEET_TITLE = 31
+    SHARD_MODES = ("sheets", "workbooks")
+
+    def __init__(self, logger=None):
+        self.logger = logger if logger else LoggerManager()
+
+    @staticmethod
+    def named_styles():
+        """The named style of every cell role."""
+        thin = Side(style='thin')
+        border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        return [
+            NamedStyle(name=ExcelReportWriter.HEADER_STYLE, font=Font(bold=True, color="FFFFFF"), border=border,
+                       fill=PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")),
+            NamedStyle(name=ExcelReportWriter.BODY_STYLE, border=border),
+            NamedStyle(name=ExcelReportWriter.TOTAL_STYLE, font=Font(bold=True), border=border,
+                       fill=PatternFill(start_color="D9EAD3", end_color="D9EAD3", fill_type="solid")),
+            NamedStyle(name=ExcelReportWriter.BANNER_STYLE, font=Font(bold=True),
+                       fill=PatternFill(start_color="FFFFCC", end_color="FFFFCC", fill_type="solid")),
+        ]
+
+    @staticmethod
+    def time_frame_banner(start_time, end_time):
+        """Banner text for a time frame, or None when no time frame applies."""
+        if start_time and end_time:
+            return f"Time Frame: {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')}"
+        return None
+
+    def write(self, df, file_path, sheet_title, banner=None, total_marker=None, progress_callback=None,
+              message="Writing file"):
+        """
+        Write the DataFrame to a new workbook at file_path.
+
+        :param banner: Optional text in a merged first row above the header.
+        :param total_marker: First-column value marking rows styled as totals.
+        :param progress_callback: Optional callable(percent, message), called while rows are written.
+        """
+        workbook = self._new_workbook()
+        self._write_sheet(workbook, sheet_title, df, ColumnAutofit.widths(df), banner, total_marker,
+                          progress_callback, message)
+        workbook.save(file_path)
+        if progress_callback:
+            progress_callback(100, "File saved")
+        self.logger.log_debug(f"Wrote {len(df)} rows to {file_path}")
+        return file_path
+
+    def write_sharded(self, df, file_path, sheet_title, max_rows=None, mode="sheets", banner=None,
+                      total_marker=None, progress_callback=None, message="Writing file", max_workers=None):
+        """
+        Write the DataFrame in shards of at most max_rows body rows (and never beyond Excel's row limit),
+        each with its own banner and header. mode "sheets" numbers the sheets of one workbook; "workbooks"
+        writes numbered files next to file_path (name_part1.xlsx, ...) in a process pool.
+        Data fitting one shard is written exactly as write() would. Returns the paths written.
+        """
+        if mode not in self.SHARD_MODES:
+            raise ValueError(f"Unknown shard mode {mode!r}; expected one of {self.SHARD_MODES}")
+        shard_rows = self.shard_rows(max_rows, banner)
+        if len(df) <= shard_rows:
+            return [self.write(df, file_path, sheet_title, banner, total_marker, progress_callback, message)]
+
+        shards = [df.iloc[start:start + shard_rows] for start in range(0, len(df), shard_rows)]
+        widths = ColumnAutofit.widths(df)  # One set of widths, so every shard looks the same
+        self.logger.log_info(f"Splitting {len(df)} rows into {len(shards)} {mode} of up to {shard_rows} rows")
+        if mode == "workbooks":
+            file_paths = self._write_workbooks(shards, file_path, sheet_title, widths, banner, total_marker,
+                                               progress_callback, message, max_workers)
+        else:
+            workbook = self._new_workbook()
+            for number, shard in enumerate(shards, start=1):
+                self._write_sheet(workbook, self.numbered_title(sheet_title, number), shard, widths, banner,
+                                  total_marker, progress_callback, message,
+                                  row_offset=(number - 1) * shard_rows, row_total=len(df))
+            workbook.save(file_path)
+            file_paths = [file_path]
+
+        if progress_callback:
+            progress_callback(100, "File saved")
+        self.logger.log_debug(f"Wrote {len(df)} rows in {len(shards)} shards to {', '.join(file_paths)}")
+        return file_paths
+
+    def shard_rows(self, max_rows=None, banner=None):
+        """Body rows per shard: max_rows, capped so banner, header and body fit on one sheet."""
+        limit = self.MAX_SHEET_ROWS - (2 if banner else 1)
+        if max_rows is None:
+            return limit
+        if int(max_rows) < 1:
+            raise ValueError(f"The row budget per shard must be positive, not {max_rows}")
+        return min(int(max_rows), limit)
+
+    @staticmethod
+    def numbered_title(sheet_title, number):
+        """'<title> <number>', shortened to fit Excel's sheet title limit."""
+        suffix = f" {number}"
+        return sheet_title[:ExcelReportWriter.MAX_SHEET_TITLE - len(suffix)] + suffix
+
+    @staticmethod
+    def numbered_path(file_path, number):
+        """'<name>_part<number><ext>' next to file_path."""
+        root, ext = os.path.splitext(file_path)
+        return f"{root}_part{number}{ext or '.xlsx'}"
+
+    def _write_workbooks(self, shards, file_path, sheet_title, widths, banner, total_marker, progress_callback,
+                         message, max_workers):
+        """Write one numbered workbook per shard in a process pool."""
+        file_paths = [self.numbered_path(file_path, number) for number in range(1, len(shards) + 1)]
+        workers = max_workers or min(len(shards), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(write_shard_file, shard, path, sheet_title, widths, banner, total_marker)
+                       for shard, path in zip(shards, file_paths)]
+            try:
+                for done, future in enumerate(as_completed(futures), start=1):
+                    future.result()
+                    if progress_callback:
+                        progress_callback(done * 90 // len(futures), message)
+            except BaseException:
+                for future in futures:
+                    future.cancel()  # Shards not yet started are dropped; the running ones finish
+                raise
+        return file_paths
+
+    def _new_workbook(self):
+        workbook = Workbook(write_only=True)
+        for style in self.named_styles():
+            workbook.add_named_style(style)
+        return workbook
+
+    def _write_sheet(self, workbook, sheet_title, df, widths, banner=None, total_marker=None, progress_callback=None,
+                     message="Writing file", row_offset=0, row_total=None):
+        """Stream the DataFrame into a new sheet; progress covers 0-90 over row_total rows."""
+        worksheet, body_cells, total_cells = self._start_sheet(workbook, sheet_title, df.columns, widths, banner)
+        self._append_rows(worksheet, df, body_cells, total_cells, total_marker, progress_callback, message,
+                          row_offset, row_total)
+        return worksheet
+
+    def _start_sheet(self, workbook, sheet_title, columns, widths, banner=None):
+        """Create a sheet with its widths, banner and header; returns it with its reusable body and total cells."""
+        worksheet = workbook.create_sheet(sheet_title)
+
+        # Write-only sheets take their column widths before the first row
+        for col_num, width in enumerate(widths, start=1):
+            worksheet.column_dimensions[get_column_letter(col_num)].width = width
+
+        if banner:
+            worksheet.append([self._cell(worksheet, self.BANNER_STYLE, banner)])
+            worksheet.merged_cells.add(CellRange(min_col=1, min_row=1, max_col=max(len(columns), 1), max_row=1))
+        worksheet.append([self._cell(worksheet, self.HEADER_STYLE, title) for title in columns])
+
+        # One reusable cell per column and role: appended rows are serialized immediately
+        body_cells = [self._cell(worksheet, self.BODY_STYLE) for _ in columns]
+        total_cells = [self._cell(worksheet, self.TOTAL_STYLE) for _ in columns]
+        return worksheet, body_cells, total_cells
+
+    def _append_rows(self, worksheet, df, body_cells, total_cells, total_marker=None, progress_callback=None,
+                     message="Writing file", row_offset=0, row_total=None):
+        """Append the DataFrame's rows below what the sheet already holds."""
+        row_count = max(row_total if row_total is not None else len(df), 1)
+        for row_num, row_data in enumerate(df.itertuples(index=False, name=None), start=row_offset + 1):
+            cells = total_cells if total_marker is not None and row_data[0] == total_marker else body_cells
+            for cell, value in zip(cells, row_data):
+                cell.value = value
+            worksheet.append(cells)
+            if progress_callback and row_num % self.PROGRESS_ROWS == 0:
+                progress_callback(row_num * 90 // row_count, message)
+
+    @staticmethod
+    def _cell(worksheet, style, value=None):
+        cell = WriteOnlyCell(worksheet, value=value)
+        cell.style = style
+        return cell
+
+
+class ExcelStreamWriter:
+    """
+    Appends DataFrame chunks to write-only workbooks as they arrive, so the whole output never
+    sits in memory. Rows roll over to a new numbered sheet or workbook at the row budget, each
+    shard repeating the banner, header and styles. Column widths are fitted to the first chunk.
+    """
+
+    def __init__(self, file_path, sheet_title, max_rows=None, mode="sheets", banner=None, total_marker=None,
+                 writer=None):
+        self.writer = writer if writer else ExcelReportWriter()
+        if mode not in ExcelReportWriter.SHARD_MODES:
+            raise ValueError(f"Unknown shard mode {mode!r}; expected one of {ExcelReportWriter.SHARD_MODES}")
+        self.file_path = file_path
+        self.sheet_title = sheet_title
+        self.mode = mode
+        self.banner = banner
+        self.total_marker = total_marker
+        self.shard_rows = self.writer.shard_rows(max_rows, banner)
+        self.columns = None
+        self.widths = None
+        self.workbook = None
+        self.sheet = None  # (worksheet, body cells, total cells) of the current shard
+        self.shards = 0
+        self.rows_in_shard = 0
+        self.rows_written = 0
+        self.saved_paths = []  # Workbooks already saved when the workbooks mode rolled over
+
+    def append(self, df):
+        """Write the chunk's rows, starting new shards as the current one fills up."""
+        if self.columns is None:
+            self.columns = list(df.columns)
+            self.widths = ColumnAutofit.widths(df)
+        elif list(df.columns) != self.columns:
+            df = df.reindex(columns=self.columns)
+
+        start = 0
+        while start < len(df):
+            if self.sheet is None or self.rows_in_shard >= self.shard_rows:
+                self._next_shard()
+            rows = df.iloc[start:start + self.shard_rows - self.rows_in_shard]
+            worksheet, body_cells, total_cells = self.sheet
+            self.writer._append_rows(worksheet, rows, body_cells, total_cells, self.total_marker)
+            self.rows_in_shard += len(rows)
+            self.rows_written += len(rows)
+            start += len(rows)
+
+    def close(self):
+        """Save the last shard and return the paths written."""
+        if self.sheet is None:
+            self._next_shard()  # No rows: still write the header
+        if self.mode == "workbooks" and self.shards > 1:
+            path = ExcelReportWriter.numbered_path(self.file_path, self.shards)
+        else:
+            path = self.file_path
+        self.workbook.save(path)
+        if path not in self.saved_paths:
+            self.saved_paths.append(path)
+        self.writer.logger.log_debug(f"Streamed {self.rows_written} rows in {self.shards} shards to "
+                                     f"{', '.join(self.saved_paths)}")
+        return self.saved_paths
+
+    def abort(self):
+        """Drop the unsaved shard and remove the workbooks already saved."""
+        self.workbook = self.sheet = None
+        for path in self.saved_paths:
+            if os.path.exists(path):
+                os.remove(path)
+        self.saved_paths = []
+
+    def _next_shard(self):
+        self.shards += 1
+        if self.mode == "workbooks" or self.workbook is None:
+            if self.workbook is not None:
+                # The first workbook learns it is part 1 only now that a second one is needed
+                path = ExcelReportWriter.numbered_path(self.file_path, self.shards - 1)
+                self.workbook.save(path)
+                self.saved_paths.append(path)
+            self.workbook = self.writer._new_workbook()
+        elif self.shards == 2:
+            self.sheet[0].title = ExcelReportWriter.numbered_title(self.sheet_title, 1)
+
+        title = self.sheet_title if self.shards == 1 or self.mode == "workbooks" else \
+            ExcelReportWriter.numbered_title(self.sheet_title, self.shards)
+        self.sheet = self.writer._start_sheet(self.workbook, title, self.columns or [], self.widths or [],
+                                              self.banner)
+        self.rows_in_shard = 0
+
+
+def write_shard_file(df, file_path, sheet_title, widths, banner=None, total_marker=None):
+    """Write one shard workbook. Module-level so it runs in worker processes."""
+    writer = ExcelReportWriter()
+    workbook = writer._new_workbook()
+    writer._write_sheet(workbook, sheet_title, df, widths, banner, total_marker)
+    workbook.save(file_path)
+    return file_path
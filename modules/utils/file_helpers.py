@@ -1,11 +1,21 @@
 import sys
 import os
+import codecs
+import itertools
+import time
 import pandas as pd
+from pandas.api.types import union_categoricals
 from datetime import datetime
+from modules.utils.cancel_token import OperationCancelled
 
 
 class FileHelper:
     PRINT_ENABLED = False  # Set this to True to enable print statements
+    CSV_SAMPLE_BYTES = 1024 * 1024  # Sample used to detect the CSV encoding and delimiter
+    CSV_FALLBACK_ENCODING = 'ISO-8859-1'  # Used when UTF-8 fails to decode; every byte is valid in it
+    CSV_CHUNK_ROWS = 100000  # Rows per chunk when streaming CSV files
+    XLSX_PROGRESS_ROWS = 10000  # Rows between progress updates when streaming .xlsx files
+    HEADER_SAMPLE_ROWS = 200  # Rows read with the header to list columns before the full load
 
     @staticmethod
     def environment_check(print_env=False):
@@ -53,6 +63,11 @@ class FileHelper:
         """Get the path to a JSON file in the resources/data folder."""
         return FileHelper.resource_path(os.path.join('resources', 'data', filename))
 
+    @staticmethod
+    def get_cache_dir_path():
+        """Get the per-user directory for cached datasets (outside the app bundle)."""
+        return os.path.join(os.path.expanduser('~'), '.excel_report_generator', 'cache')
+
     @staticmethod
     def get_version_file_path():
         """Get the path to the version.txt file."""
@@ -97,82 +112,326 @@ class FileHelper:
         return file_mod_time > ref_mod_time
 
     @staticmethod
-    def read_excel(file_path):
+    def read_excel(file_path, usecols=None, dtype=None, progress_callback=None, nrows=None):
+        """
+        Reads an Excel file. .xlsx workbooks are streamed read-only (see read_xlsx_streaming);
+        .xls workbooks are read with xlrd.
+
+        :param usecols: Optional column projection (list of names or callable).
+        :param dtype: Optional dtype plan, e.g. {"Type Description": "category"}.
+        :param progress_callback: Optional callable(percent, rows_read).
+        :param nrows: Optional number of data rows to read.
+        """
         try:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"File not found: {file_path}")
 
             if file_path.endswith('.xls'):
-                df = pd.read_excel(file_path, engine='xlrd')
+                df = pd.read_excel(file_path, engine='xlrd', usecols=usecols, dtype=dtype, nrows=nrows)
             else:
-                df = pd.read_excel(file_path, engine='openpyxl')
+                df = FileHelper.read_xlsx_streaming(file_path, usecols=usecols, dtype=dtype,
+                                                    progress_callback=progress_callback, nrows=nrows)
 
             if df.empty:
                 raise ValueError("Excel file is empty.")
             return df
+        except OperationCancelled:
+            raise
         except Exception as e:
             print(f"Error reading Excel file: {e}")
             return None
 
     @staticmethod
-    def read_csv(file_path):
-        """Reads a CSV file with robust handling for encoding and delimiters."""
-        try:
-            # Check for BOM and file encoding
-            with open(file_path, 'rb') as f:
-                raw_data = f.read(4)
-                if raw_data.startswith(b'\xff\xfe') or raw_data.startswith(b'\xfe\xff'):
-                    # UTF-16 encoded
-                    encoding = 'utf-16'
-                elif raw_data.startswith(b'\xef\xbb\xbf'):
-                    # UTF-8 with BOM
-                    encoding = 'utf-8-sig'
-                else:
-                    # Default to utf-8
-                    encoding = 'utf-8'
-
-            # Attempt to infer the delimiter automatically
-            with open(file_path, 'r', encoding=encoding) as f:
-                first_line = f.readline()
-                if ',' in first_line:
-                    delimiter = ','
-                elif '\t' in first_line:
-                    delimiter = '\t'
-                elif ';' in first_line:
-                    delimiter = ';'
-                else:
-                    delimiter = ','  # Fallback to comma as default
-
-            # Load the CSV into a DataFrame
-            df = pd.read_csv(file_path, encoding=encoding, delimiter=delimiter)
-            
-            # Print column names and the first few rows for debugging
-            # print(f"Loaded DataFrame columns: {df.columns}")
-            # print(f"First few rows:\n{df.head()}")
+    def read_xlsx_streaming(file_path, usecols=None, dtype=None, progress_callback=None, nrows=None):
+        """
+        Stream the first sheet of an .xlsx workbook without building the openpyxl object model.
 
-            return df
-        except UnicodeDecodeError:
+        The workbook is opened read-only with cached values only and shared strings parsed on
+        demand, rows are iterated as plain tuples, and only the projected columns are collected
+        into per-column arrays.
+        """
+        from modules.utils.logger_manager import LoggerManager  # Imported here: logger_manager imports FileHelper
+        from modules.utils.xlsx_reader import LazyExcelReader
+
+        started = time.perf_counter()
+        with LazyExcelReader.open_workbook(file_path) as workbook:
+            sheet = workbook.worksheets[0]
+            total_rows = max((sheet.max_row or 1) - 1, 1)
+            rows = sheet.iter_rows(values_only=True)
+
+            header = FileHelper._excel_header(next(rows, ()))
+            if usecols is None:
+                keep = None
+            else:
+                keep = usecols if callable(usecols) else set(usecols).__contains__
+            positions = [i for i, name in enumerate(header) if keep is None or keep(name)]
+            values = [[] for _ in positions]
+
+            if nrows is not None:
+                rows = itertools.islice(rows, nrows)
+            rows_read = 0
+            for row in FileHelper._data_rows(rows):
+                row_width = len(row)
+                for column_values, position in zip(values, positions):
+                    column_values.append(row[position] if position < row_width else None)
+                rows_read += 1
+                if progress_callback and rows_read % FileHelper.XLSX_PROGRESS_ROWS == 0:
+                    progress_callback(min(100, int(rows_read * 100 / total_rows)), rows_read)
+
+        df = FileHelper._columns_frame(header, positions, values, dtype)
+
+        if progress_callback:
+            progress_callback(100, rows_read)
+        elapsed = time.perf_counter() - started
+        LoggerManager().log_info(
+            f"Read {rows_read} rows x {len(positions)} columns from {os.path.basename(file_path)} "
+            f"in {elapsed:.2f}s ({rows_read / max(elapsed, 1e-9):,.0f} rows/s)")
+        return df
+
+    @staticmethod
+    def iter_xlsx_chunks(file_path, chunksize=None, progress_callback=None):
+        """
+        Yield the first sheet of an .xlsx workbook as DataFrames of up to chunksize rows,
+        streaming it read-only like read_xlsx_streaming without holding the whole sheet.
+        """
+        from modules.utils.xlsx_reader import LazyExcelReader
+
+        chunksize = chunksize or FileHelper.CSV_CHUNK_ROWS
+        with LazyExcelReader.open_workbook(file_path) as workbook:
+            sheet = workbook.worksheets[0]
+            total_rows = max((sheet.max_row or 1) - 1, 1)
+            rows = sheet.iter_rows(values_only=True)
+
+            header = FileHelper._excel_header(next(rows, ()))
+            positions = list(range(len(header)))
+            values = [[] for _ in positions]
+            rows_read = 0
+            for row in FileHelper._data_rows(rows):
+                row_width = len(row)
+                for column_values, position in zip(values, positions):
+                    column_values.append(row[position] if position < row_width else None)
+                rows_read += 1
+                if rows_read % chunksize == 0:
+                    if progress_callback:
+                        progress_callback(min(100, int(rows_read * 100 / total_rows)), rows_read)
+                    yield FileHelper._columns_frame(header, positions, values)
+                    values = [[] for _ in positions]
+            if rows_read % chunksize or rows_read == 0:
+                yield FileHelper._columns_frame(header, positions, values)
+        if progress_callback:
+            progress_callback(100, rows_read)
+
+    @staticmethod
+    def _data_rows(rows):
+        """
+        Yield worksheet rows as pd.read_excel keeps them: blank rows between rows with data
+        come through as empty rows, blank rows after the last row with data are dropped.
+        """
+        blank_rows = []
+        for row in rows:
+            if any(cell is not None for cell in row):
+                yield from blank_rows
+                blank_rows = []
+                yield row
+            else:
+                blank_rows.append(row)
+
+    @staticmethod
+    def _columns_frame(header, positions, values, dtype=None):
+        """Build a DataFrame from per-column value lists read out of a worksheet."""
+        columns = {}
+        for column_values, position in zip(values, positions):
+            name = header[position]
+            series = pd.Series(column_values, name=name)
+            if series.dtype == object:
+                # Blank columns become float NaN, as pandas reads them
+                series = series.astype('float64') if series.isna().all() else series.infer_objects()
+            if dtype and name in dtype:
+                series = series.astype(dtype[name])
+            columns[name] = series
+        return pd.DataFrame(columns, columns=[header[position] for position in positions])
+
+    @staticmethod
+    def _excel_header(cells):
+        """Header names as pandas would produce them: blanks become 'Unnamed: i', duplicates get '.n'."""
+        header = []
+        seen = {}
+        for i, cell in enumerate(cells):
+            name = f"Unnamed: {i}" if cell is None else cell
+            if name in seen:
+                seen[name] += 1
+                name = f"{name}.{seen[name]}"
+            else:
+                seen[name] = 0
+            header.append(name)
+        return header
+
+    @staticmethod
+    def detect_csv_format(file_path):
+        """Detect the encoding and delimiter of a CSV file from a sample at the start of the file."""
+        with open(file_path, 'rb') as f:
+            sample = f.read(FileHelper.CSV_SAMPLE_BYTES)
+
+        # Check for BOM and file encoding
+        if sample.startswith(b'\xff\xfe') or sample.startswith(b'\xfe\xff'):
+            # UTF-16 encoded
+            encoding = 'utf-16'
+        elif sample.startswith(b'\xef\xbb\xbf'):
+            # UTF-8 with BOM
+            encoding = 'utf-8-sig'
+        else:
+            # UTF-8 if the sample decodes (a character cut off at the end of the sample is fine)
             try:
-                # Fallback to ISO-8859-1 encoding
-                df = pd.read_csv(file_path, encoding='ISO-8859-1', delimiter=delimiter)
-                # print(f"Loaded DataFrame with ISO-8859-1 encoding:\n{df.head()}")
-                return df
-            except Exception as e:
-                print(f"Error reading CSV file with multiple encoding attempts: {e}")
-                return None
+                codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+                encoding = 'utf-8'
+            except UnicodeDecodeError:
+                encoding = FileHelper.CSV_FALLBACK_ENCODING
+
+        # Attempt to infer the delimiter automatically
+        lines = sample.decode(encoding, errors='ignore').splitlines()
+        first_line = lines[0] if lines else ''
+        if ',' in first_line:
+            delimiter = ','
+        elif '\t' in first_line:
+            delimiter = '\t'
+        elif ';' in first_line:
+            delimiter = ';'
+        else:
+            delimiter = ','  # Fallback to comma as default
+
+        return encoding, delimiter
+
+    @staticmethod
+    def read_csv(file_path, usecols=None, dtype=None, chunksize=None, progress_callback=None, nrows=None):
+        """
+        Reads a CSV file with robust handling for encoding and delimiters.
+
+        The encoding is detected from a sample; a UTF-8 file holding other bytes past the
+        sample falls back to ISO-8859-1 (see iter_csv_chunks).
+        With chunksize, the file is streamed in chunks of that many rows and
+        progress_callback(percent, rows_read) is called after every chunk.
+
+        :param usecols: Optional column projection (list of names or callable).
+        :param dtype: Optional dtype plan, e.g. {"Type Description": "category"}.
+        :param nrows: Optional number of data rows to read.
+        """
+        try:
+            if not chunksize:
+                encoding, delimiter = FileHelper.detect_csv_format(file_path)
+                read_options = dict(delimiter=delimiter, usecols=usecols, dtype=dtype, nrows=nrows)
+                try:
+                    return pd.read_csv(file_path, encoding=encoding, **read_options)
+                except UnicodeDecodeError as e:
+                    if not FileHelper._can_fall_back(encoding):
+                        raise
+                    FileHelper._log_encoding_fallback(file_path, encoding, e)
+                    return pd.read_csv(file_path, encoding=FileHelper.CSV_FALLBACK_ENCODING, **read_options)
+
+            chunks = list(FileHelper.iter_csv_chunks(file_path, chunksize, progress_callback,
+                                                     usecols=usecols, dtype=dtype, nrows=nrows))
+            return FileHelper.concat_chunks(chunks)
+        except OperationCancelled:
+            raise
         except Exception as e:
             print(f"Error reading CSV file: {e}")
             return None
 
+    @staticmethod
+    def iter_csv_chunks(file_path, chunksize=None, progress_callback=None, **read_options):
+        """
+        Yield a CSV file as DataFrames of up to chunksize rows; progress_callback(percent, rows_read)
+        is called after every chunk.
 
+        When a file detected as UTF-8 fails to decode past the detection sample, reading restarts
+        as ISO-8859-1 and carries on after the rows already yielded.
+        """
+        chunksize = chunksize or FileHelper.CSV_CHUNK_ROWS
+        encoding, delimiter = FileHelper.detect_csv_format(file_path)
+        total_bytes = max(os.path.getsize(file_path), 1)
+        rows_read = 0
+        while True:
+            try:
+                skip = rows_read  # Rows yielded before a restart
+                with open(file_path, 'rb') as handle:
+                    for chunk in pd.read_csv(handle, chunksize=chunksize, encoding=encoding, delimiter=delimiter,
+                                             **read_options):
+                        if skip:
+                            skipped = min(skip, len(chunk))
+                            chunk, skip = chunk.iloc[skipped:], skip - skipped
+                            if chunk.empty:
+                                continue
+                        rows_read += len(chunk)
+                        if progress_callback:
+                            progress_callback(min(100, int(handle.tell() * 100 / total_bytes)), rows_read)
+                        yield chunk
+                return
+            except UnicodeDecodeError as e:
+                if not FileHelper._can_fall_back(encoding):
+                    raise
+                FileHelper._log_encoding_fallback(file_path, encoding, e)
+                encoding = FileHelper.CSV_FALLBACK_ENCODING
+
+    @staticmethod
+    def _can_fall_back(encoding):
+        return encoding in ('utf-8', 'utf-8-sig')
+
+    @staticmethod
+    def _log_encoding_fallback(file_path, encoding, error):
+        from modules.utils.logger_manager import LoggerManager  # Imported here: logger_manager imports FileHelper
+        LoggerManager().log_warning(f"{os.path.basename(file_path)} is not valid {encoding} past the detection "
+                                    f"sample ({error}); reading it as {FileHelper.CSV_FALLBACK_ENCODING}")
+
+    @staticmethod
+    def iter_chunks(file_path, chunksize=None, progress_callback=None):
+        """
+        Yield a CSV or Excel file as DataFrames of up to chunksize rows, so the whole file is never
+        held at once; progress_callback(percent, rows_read) is called after every chunk.
+        .xls workbooks have no streaming reader and come as a single frame.
+        """
+        chunksize = chunksize or FileHelper.CSV_CHUNK_ROWS
+        if file_path.endswith(('.csv', '.txt')):
+            yield from FileHelper.iter_csv_chunks(file_path, chunksize, progress_callback)
+        elif file_path.endswith('.xlsx'):
+            yield from FileHelper.iter_xlsx_chunks(file_path, chunksize, progress_callback)
+        elif file_path.endswith('.xls'):
+            yield pd.read_excel(file_path, engine='xlrd')
+        else:
+            raise ValueError(f"Unsupported file format: {file_path}")
+
+    @staticmethod
+    def concat_chunks(chunks):
+        """
+        Concatenate DataFrame chunks, keeping categorical columns categorical across chunks.
+        Chunks may have different columns (e.g. exports from several files); the result has their union.
+        """
+        if not chunks:
+            return pd.DataFrame()
+
+        columns = list(dict.fromkeys(col for chunk in chunks for col in chunk.columns))
+        for col in columns:
+            parts = [chunk[col] for chunk in chunks if col in chunk.columns]
+            if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+                categories = union_categoricals(parts, ignore_order=True).categories
+                dtype = pd.CategoricalDtype(categories)
+                for chunk in chunks:
+                    chunk[col] = chunk[col].cat.set_categories(categories) if col in chunk.columns \
+                        else pd.Series(pd.Categorical([None] * len(chunk), dtype=dtype), index=chunk.index)
+
+        return pd.concat(chunks, ignore_index=True)
+
+    @staticmethod
+    def read_header(file_path, sample_rows=None):
+        """Read only the header and the first sample_rows rows of a CSV or Excel file."""
+        return FileHelper.read_file(file_path, nrows=sample_rows or FileHelper.HEADER_SAMPLE_ROWS)
 
     @staticmethod
-    def read_file(file_path):
+    def read_file(file_path, **read_options):
         """General method to read either CSV or Excel files based on the extension."""
         if file_path.endswith(('.csv', '.txt')):
-            return FileHelper.read_csv(file_path)
+            return FileHelper.read_csv(file_path, **read_options)
         elif file_path.endswith(('.xlsx', '.xls')):
-            return FileHelper.read_excel(file_path)
+            read_options.pop('chunksize', None)  # Excel files are streamed row by row instead
+            return FileHelper.read_excel(file_path, **read_options)
         else:
             raise ValueError(f"Unsupported file format: {file_path}")
 
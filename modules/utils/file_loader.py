@@ -1,39 +1,174 @@
-import pandas as pd
+import os
+import threading
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
 from modules.utils.file_helpers import FileHelper  # Import FileHelper to use read_excel and read_csv methods
+from modules.utils.dataset_loader import DatasetLoader
+from modules.utils.logger_manager import LoggerManager
+from modules.utils.worker import Worker
+from modules.utils.cancel_token import OperationCancelled
 
 class FileLoader:
+    # Columns every report run reads; loaded in the background as soon as the header is shown
+    BASE_COLUMNS = DatasetLoader.BASE_COLUMNS
+
     def __init__(self, parent):
         self.parent = parent
+        self.logger = LoggerManager()
         self.df = None
+        self.dataset = None  # PreparedDataset handed to the report engine
+        self.file_paths = []  # Files combined into the loaded dataset
+        self.header = None  # Sample of the first rows with mapped column names
+        self.loaded_columns = set()  # Columns requested for the current dataset
+        self.body_worker = None  # Background load of the base columns
+        self._body_lock = threading.Lock()  # Serializes ensure_body between report tasks
+        self.loader = DatasetLoader.from_settings()  # Reads, prepares and caches datasets
+        self.preparer = self.loader.preparer
+
+    FILE_FILTER = "Supported Files (*.xlsx *.xls *.csv);;Excel Files (*.xlsx *.xls);;CSV Files (*.csv);;All Files (*)"
 
     def load_file(self):
         """
         Loads an Excel or CSV file using a file dialog and updates the columns.
         """
         try:
-            file_path, _ = QFileDialog.getOpenFileName(
-                self.parent,
-                "Open File",
-                "",
-                "Supported Files (*.xlsx *.xls *.csv);;Excel Files (*.xlsx *.xls);;CSV Files (*.csv);;All Files (*)"
-            )
+            file_path, _ = QFileDialog.getOpenFileName(self.parent, "Open File", "", self.FILE_FILTER)
             if file_path:
-                # Use FileHelper to read the file
-                self.df = FileHelper.read_file(file_path)
-
-                if self.df is not None:
-                    # Map columns and check for missing required columns
-                    self.df = self.map_columns(self.df)
-                    self.check_missing_columns(self.df)
-
-                    # Populate UI checkboxes with column names
-                    self.parent.checkbox_manager.populate_checkboxes(self.df.columns)
-                else:
-                    QMessageBox.warning(self.parent, "Error", "The selected file could not be read.")
+                self.open_files([file_path])
         except Exception as e:
             QMessageBox.critical(self.parent, "Error", f"Failed to load file: {e}")
 
+    def load_multiple_files(self):
+        """
+        Loads several exports (e.g. one per month) as one dataset.
+        """
+        try:
+            file_paths, _ = QFileDialog.getOpenFileNames(self.parent, "Open Files", "", self.FILE_FILTER)
+            if file_paths:
+                self.open_files(sorted(file_paths))
+        except Exception as e:
+            QMessageBox.critical(self.parent, "Error", f"Failed to load files: {e}")
+
+    def load_folder(self):
+        """
+        Loads every supported export in a folder as one dataset.
+        """
+        try:
+            folder = QFileDialog.getExistingDirectory(self.parent, "Open Folder", "")
+            if not folder:
+                return
+            file_paths = DatasetLoader.list_folder(folder)
+            if file_paths:
+                self.open_files(file_paths)
+            else:
+                QMessageBox.warning(self.parent, "No Files", "The selected folder has no Excel or CSV files.")
+        except Exception as e:
+            QMessageBox.critical(self.parent, "Error", f"Failed to load folder: {e}")
+
+    def open_files(self, file_paths):
+        """
+        Show the columns of the given files, then load their body in the background.
+        """
+        # Phase one: read the headers and a small sample so the columns can be picked right away
+        self.clear()
+        samples = []
+        for file_path in file_paths:
+            sample = FileHelper.read_header(file_path)
+            if sample is None:
+                QMessageBox.warning(self.parent, "Error", f"The selected file could not be read: {os.path.basename(file_path)}")
+                return
+            samples.append(self.preparer.map_columns(sample))
+
+        self.file_paths = list(file_paths)
+        self.header = FileHelper.concat_chunks(samples)  # Union of the files' columns
+        self.check_missing_columns(self.header)
+
+        # Populate UI checkboxes with column names
+        self.parent.checkbox_manager.populate_checkboxes(self.get_display_columns())
+
+        # Phase two: load the base columns in the background, with progress and cancellation
+        columns = self.base_columns()
+        self.body_worker = Worker(self._load_body, self.file_paths, columns)
+        self.loaded_columns = set(columns)
+        tasks = getattr(self.parent, "tasks", None)
+        if tasks is not None:
+            worker = self.body_worker
+            tasks.start(worker, on_finished=self._body_loaded, on_cancelled=lambda: self._body_cancelled(worker))
+        else:
+            self.body_worker.start()
+
+    def base_columns(self):
+        """The base report columns, plus the deduplication column, present in the loaded file."""
+        columns = self.BASE_COLUMNS + [self.preparer.keep_latest_by]
+        return [col for col in dict.fromkeys(columns) if col in self.header.columns]
+
+    def _body_loaded(self, dataset):
+        """Tell the user how many repeated service requests and unreadable dates the background load found."""
+        if dataset is not None and dataset.duplicates_dropped:
+            QMessageBox.information(self.parent, "Duplicates Removed",
+                                    f"Removed {dataset.duplicates_dropped} duplicate service requests "
+                                    f"(kept the latest by '{self.preparer.keep_latest_by}').")
+        if dataset is not None and dataset.unparseable_dates:
+            QMessageBox.warning(self.parent, "Unreadable Dates",
+                                f"{dataset.unparseable_dates} 'Created Date' values could not be read as dates; "
+                                f"those service requests are left out of the reports.")
+
+    def _body_cancelled(self, worker):
+        """Tell the parent when the user cancelled the current file's load (not a replaced one)."""
+        if worker is self.body_worker and hasattr(self.parent, "on_load_cancelled"):
+            self.parent.on_load_cancelled()
+
+    def _load_body(self, worker, file_paths, columns):
+        """Worker task reading the base columns, then letting the parent prepare the dataset off the UI thread."""
+        dataset = self.read_dataset(file_paths, columns, worker.stage(0, 100, "Loading file"))
+        if dataset is not None and hasattr(self.parent, "on_body_read"):
+            self.parent.on_body_read(dataset)
+        return dataset
+
+    def ensure_body(self, columns=(), progress_callback=None):
+        """
+        Return the prepared dataset holding at least the base columns and the given columns.
+        Waits for the background load, then reads any missing columns before returning.
+        Safe to call from worker threads; progress_callback defaults to the parent's progress bar.
+        """
+        with self._body_lock:
+            file_paths, header = self.file_paths, self.header
+            if not file_paths:
+                return None
+
+            if self.body_worker is not None:
+                worker, self.body_worker = self.body_worker, None
+                try:
+                    self.set_dataset(worker.future.result())
+                except OperationCancelled:
+                    self.logger.log_info("Background load was cancelled; reading the file now")
+                    self.set_dataset(None)
+
+            wanted = [col for col in self.base_columns() + list(columns) if col in header.columns]
+            missing = [col for col in wanted if col not in self.loaded_columns]
+            if missing or self.dataset is None:
+                self.logger.log_info(f"Loading columns {missing} from {len(file_paths)} file(s)")
+                columns = [col for col in header.columns if col in self.loaded_columns or col in wanted]
+                self.set_dataset(self.read_dataset(file_paths, columns, progress_callback or self.report_progress))
+                self.loaded_columns = set(columns)
+            return self.dataset
+
+    def set_dataset(self, dataset):
+        """Make a prepared dataset the loaded data."""
+        self.dataset = dataset
+        self.df = dataset.frame if dataset is not None else None
+
+    def read_dataset(self, file_paths, columns=None, progress_callback=None):
+        """Return the prepared dataset for the files (limited to columns, if given), or None if unreadable."""
+        return self.loader.read_dataset(file_paths, columns, progress_callback)
+
+    def report_progress(self, percent, rows_read):
+        """
+        Show file reading progress on the parent's progress bar, if it has one.
+        """
+        progress_bar = getattr(self.parent, "progress_bar", None)
+        if progress_bar is not None:
+            progress_bar.setValue(percent)
+
     def check_missing_columns(self, df):
         """
         Check if there are any missing required columns.
@@ -64,73 +199,24 @@ class FileLoader:
         """
         Map known columns with alternative names to user-friendly names.
         """
-        column_mapping = {
-            "Service Request Number": ["Service Request Number", "Service_Re","SR #"],
-            "Created Date": ["Created Date", "Created_Da", "Created Date Only"],
-            "Type Description": ["Type Description", "Type_Descr"],
-            "Group Description": ["Group Description", "Group_Desc"],
-            "X Value": ["X Value", "X_Value"],
-            "Y Value": ["Y Value", "Y_Value"]
-        }
-
-        for friendly_name, options in column_mapping.items():
-            for option in options:
-                if option in df.columns:
-                    df = df.rename(columns={option: friendly_name})
-                    break  # Stop renaming once a match is found
+        return self.preparer.map_columns(df)
 
-        return df
-
-    def validate_time_columns(self):
+    def get_display_columns(self):
         """
-        Validate if the file contains time-related data.
+        Return the column names of the loaded file, as read from its header.
         """
-        if self.df is None:
-            QMessageBox.warning(self.parent, "No Data", "No file loaded to validate.")
-            return False
-
-        if "Created Date" in self.df.columns:
-            # Check for valid datetime in the "Created Date" column
-            if not pd.to_datetime(self.df["Created Date"], errors="coerce").isnull().all():
-                return True
-
-        elif "Time" in self.df.columns:
-            # Check for valid time in a standalone "Time" column
-            if not pd.to_datetime(self.df["Time"], errors="coerce").isnull().all():
-                return True
+        if self.header is None:
+            return []
+        return list(self.header.columns)
 
-        QMessageBox.warning(
-            self.parent,
-            "No Time Data",
-            "The file does not contain valid time-related data."
-        )
-        return False
-
-    def filter_by_time_frame(self, start_date, end_date, start_time=None, end_time=None):
+    def clear(self):
         """
-        Filter the DataFrame by the specified time frame and date range.
+        Drop the loaded file and dataset; a pending background load is discarded.
         """
-        if self.df is None:
-            QMessageBox.warning(self.parent, "No Data", "No file loaded to filter.")
-            return None
-
-        if not self.validate_time_columns():
-            return self.df
-
-        if "Created Date" in self.df.columns:
-            self.df["Created Date"] = pd.to_datetime(self.df["Created Date"], errors="coerce")
-            # Filter by date range
-            self.df = self.df[(self.df["Created Date"].dt.date >= start_date) &
-                              (self.df["Created Date"].dt.date <= end_date)]
-
-            # Filter by time frame if provided
-            if start_time and end_time:
-                self.df = self.df[(self.df["Created Date"].dt.time >= start_time) &
-                                  (self.df["Created Date"].dt.time <= end_time)]
-
-        elif "Time" in self.df.columns:
-            self.df["Time"] = pd.to_datetime(self.df["Time"], errors="coerce").dt.time
-            if start_time and end_time:
-                self.df = self.df[(self.df["Time"] >= start_time) & (self.df["Time"] <= end_time)]
-
-        return self.df
+        if self.body_worker is not None:
+            self.body_worker.cancel()
+        self.body_worker = None
+        self.file_paths = []
+        self.header = None
+        self.loaded_columns = set()
+        self.set_dataset(None)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+
+class LocationHelper:
+    """Vectorized classification of rows that lack a usable X Value / Y Value location."""
+
+    HAS_LOCATION_COLUMN = "Has Location"
+
+    @staticmethod
+    def classify(df, sentinel_values=None, bounding_box=None):
+        """
+        Return an int8 array that is 1 where the row has a usable location and 0 where it does not.
+
+        A location is unusable when either coordinate is missing or non-numeric, when both
+        coordinates are 0, when either coordinate equals a sentinel value, or when the point
+        falls outside the bounding box.
+
+        :param df: DataFrame with 'X Value' and 'Y Value' columns.
+        :param sentinel_values: Coordinate values that mean "no location" (e.g. -1, 9999999).
+        :param bounding_box: Optional {"min_x", "min_y", "max_x", "max_y"} of valid coordinates.
+        """
+        x = pd.to_numeric(df["X Value"], errors="coerce").to_numpy(dtype=np.float64)
+        y = pd.to_numeric(df["Y Value"], errors="coerce").to_numpy(dtype=np.float64)
+
+        valid = ~(np.isnan(x) | np.isnan(y))
+        valid &= ~((x == 0) & (y == 0))
+
+        if sentinel_values:
+            sentinels = np.asarray(list(sentinel_values), dtype=np.float64)
+            valid &= ~(np.isin(x, sentinels) | np.isin(y, sentinels))
+
+        if bounding_box:
+            valid &= (x >= bounding_box.get("min_x", -np.inf)) & (x <= bounding_box.get("max_x", np.inf))
+            valid &= (y >= bounding_box.get("min_y", -np.inf)) & (y <= bounding_box.get("max_y", np.inf))
+
+        return valid.astype(np.int8)
+
+    @staticmethod
+    def add_location_column(df, sentinel_values=None, bounding_box=None):
+        """Return the DataFrame with the location-validity column added."""
+        return df.assign(**{
+            LocationHelper.HAS_LOCATION_COLUMN: LocationHelper.classify(df, sentinel_values, bounding_box)
+        })
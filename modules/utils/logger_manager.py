@@ -1,8 +1,8 @@
 import logging
 import os
+import sys
 from logging.handlers import RotatingFileHandler
 from modules.utils.file_helpers import FileHelper
-from PyQt6 import QtCore
 
 
 class LoggerManager:
@@ -68,6 +68,7 @@ class LoggerManager:
 
     def qt_message_handler(self, mode, context, message):
         """Custom Qt message handler to direct Qt messages to Python's logging system."""
+        from PyQt6 import QtCore
         if mode == QtCore.QtMsgType.QtDebugMsg:
             level = logging.DEBUG
         elif mode == QtCore.QtMsgType.QtInfoMsg:
@@ -87,8 +88,9 @@ class LoggerManager:
             return
 
         try:
-            # Install the Qt message handler
-            QtCore.qInstallMessageHandler(self.qt_message_handler)
+            # Install the Qt message handler when running with Qt (headless tools never import it)
+            if "PyQt6.QtCore" in sys.modules:
+                sys.modules["PyQt6.QtCore"].qInstallMessageHandler(self.qt_message_handler)
 
             # Configure file handlers for general and error logs
             general_log_file = os.path.join(self.log_dir, "app_general.log")
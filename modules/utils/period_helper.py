@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+
+class PeriodHelper:
+    """Integer Year-Month period codes (year * 12 + month - 1) used to bucket reports."""
+
+    PERIOD_COLUMN = "Created Period"
+    MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    MISSING = -1
+
+    @staticmethod
+    def from_dates(dates):
+        """Convert a datetime Series to an int32 array of period codes (-1 for missing dates)."""
+        values = pd.to_datetime(dates, errors='coerce').to_numpy(dtype='datetime64[ns]')
+        missing = np.isnat(values)
+        # Months since 1970-01, shifted so the code reads as year * 12 + month - 1
+        codes = values.astype('datetime64[M]').astype(np.int64) + 1970 * 12
+        codes[missing] = PeriodHelper.MISSING
+        return codes.astype(np.int32)
+
+    @staticmethod
+    def from_datetime(value):
+        """Return the period code for a single date or datetime."""
+        return value.year * 12 + value.month - 1
+
+    @staticmethod
+    def period_range(start_date, end_date):
+        """Return the ordered period codes covering start_date through end_date."""
+        return list(range(PeriodHelper.from_datetime(start_date), PeriodHelper.from_datetime(end_date) + 1))
+
+    @staticmethod
+    def label(code):
+        """Return the column label for a period code, e.g. 'Jan 2025'."""
+        year, month_index = divmod(int(code), 12)
+        return f"{PeriodHelper.MONTH_NAMES[month_index]} {year}"
+
+    @staticmethod
+    def add_period_column(df, date_column='Created Date'):
+        """Return the DataFrame with the period code column derived from date_column."""
+        return df.assign(**{PeriodHelper.PERIOD_COLUMN: PeriodHelper.from_dates(df[date_column])})
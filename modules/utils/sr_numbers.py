@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+
+class SRNumberHelper:
+    """Vectorized parsing of service request numbers such as '24-00012345'."""
+
+    KEY_COLUMN = "SR Key"  # Prepared datasets hold these keys instead of the SR number text
+    MISSING = -1
+    NUMBER_DIGITS = 10  # The numeric part occupies the low 10 decimal digits of a key
+    MAX_LENGTH = 19     # Longest parseable value, e.g. an 8-character prefix, the dash and 10 digits
+    CHUNK_ROWS = 100000
+
+    @staticmethod
+    def normalized_keys(series):
+        """
+        Return an int64 key per SR number that is equal for numbers with the same prefix and the
+        same numeric part, the way SRFormatter._add_leading_zeros pads them: 'SR-123' and
+        'SR-00000123' share a key. The prefix may be any text; values that are not
+        '<prefix>-<digits>' are keyed by their exact value, and missing values get MISSING.
+        """
+        values = series.to_numpy(dtype=object)
+        keys = np.full(len(values), SRNumberHelper.MISSING, dtype=np.int64)
+        if len(values) == 0:
+            return keys
+
+        missing = np.asarray(pd.isna(values))
+        prefixes, numbers, parsed = SRNumberHelper._split(values)
+        parsed &= ~missing
+
+        # Hash the prefixes and the unparseable values once each, then pack them into one key
+        prefix_codes, _ = pd.factorize(prefixes[parsed])
+        keys[parsed] = prefix_codes.astype(np.int64) * 10**SRNumberHelper.NUMBER_DIGITS + numbers[parsed]
+        other = ~parsed & ~missing
+        if other.any():
+            other_codes, _ = pd.factorize(values[other])
+            keys[other] = SRNumberHelper.MISSING - 1 - other_codes.astype(np.int64)
+        return keys
+
+    @staticmethod
+    def _split(values):
+        """Split every value into (prefix text, numeric part, parsed flag), one chunk at a time."""
+        prefixes = np.empty(len(values), dtype=f"U{SRNumberHelper.MAX_LENGTH + 1}")
+        numbers = np.zeros(len(values), dtype=np.int64)
+        parsed = np.zeros(len(values), dtype=bool)
+        for start in range(0, len(values), SRNumberHelper.CHUNK_ROWS):
+            stop = min(start + SRNumberHelper.CHUNK_ROWS, len(values))
+            prefixes[start:stop], numbers[start:stop], parsed[start:stop] = \
+                SRNumberHelper._split_chunk(values[start:stop])
+        return prefixes, numbers, parsed
+
+    @staticmethod
+    def _code_points(values):
+        """(rows x characters) code point matrix; one spare character flags values that are too long."""
+        width = SRNumberHelper.MAX_LENGTH + 1
+        return values.astype(f"U{width}").view(np.uint32).reshape(len(values), width)
+
+    @staticmethod
+    def _split_chunk(values):
+        """Split a chunk into (prefix text, numeric part, parsed flag) on its code point matrix."""
+        chars = SRNumberHelper._code_points(values)
+        width = chars.shape[1]
+
+        is_digit = (chars >= ord("0")) & (chars <= ord("9"))
+        is_dash = chars == ord("-")
+        length = (chars != 0).sum(axis=1)
+        dash = is_dash.argmax(axis=1)
+        positions = np.arange(width)
+
+        # Exactly one dash, followed by 1-10 digits and nothing else
+        in_number = (positions > dash[:, None]) & (positions < length[:, None])
+        parsed = (is_dash.sum(axis=1) == 1) & (chars[:, -1] == 0)
+        parsed &= (is_digit | ~in_number).all(axis=1)
+        parsed &= (length - dash - 1 >= 1) & (length - dash - 1 <= SRNumberHelper.NUMBER_DIGITS)
+
+        number = np.zeros(len(values), dtype=np.int64)
+        for position in range(1, width):
+            rows = parsed & in_number[:, position]
+            number[rows] = number[rows] * 10 + (chars[rows, position].astype(np.int64) - ord("0"))
+
+        prefix = np.where(positions < dash[:, None], chars, 0).astype(np.uint32)
+        return prefix.view(f"U{width}").ravel(), number, parsed
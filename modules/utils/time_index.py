@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+
+class TimeIndexHelper:
+    """Sorted 'Created Date' index with integer keys for binary-search date and time filtering."""
+
+    EPOCH_COLUMN = "Created Epoch"
+    SECONDS_COLUMN = "Created Seconds"
+    SECONDS_PER_DAY = 86400
+
+    @staticmethod
+    def add_time_keys(df, date_column='Created Date'):
+        """
+        Return the DataFrame sorted by date_column with an int64 epoch (ns) column and an
+        int32 seconds-since-midnight column. Missing dates sort first with a -1 seconds key.
+        """
+        df = df.sort_values(date_column, kind='stable', na_position='first', ignore_index=True)
+        values = pd.to_datetime(df[date_column], errors='coerce').to_numpy(dtype='datetime64[ns]')
+        missing = np.isnat(values)
+
+        epoch = values.view(np.int64)
+        seconds = values.astype('datetime64[s]').astype(np.int64) % TimeIndexHelper.SECONDS_PER_DAY
+        seconds[missing] = -1
+
+        return df.assign(**{
+            TimeIndexHelper.EPOCH_COLUMN: epoch,
+            TimeIndexHelper.SECONDS_COLUMN: seconds.astype(np.int32),
+        })
+
+    @staticmethod
+    def is_indexed(df):
+        """Check whether the DataFrame carries sorted time keys."""
+        if TimeIndexHelper.EPOCH_COLUMN not in df.columns or TimeIndexHelper.SECONDS_COLUMN not in df.columns:
+            return False
+        return df[TimeIndexHelper.EPOCH_COLUMN].is_monotonic_increasing
+
+    @staticmethod
+    def to_epoch(value):
+        """Convert a date or datetime to the int64 nanosecond epoch used by the index."""
+        return pd.Timestamp(value).as_unit('ns').value
+
+    @staticmethod
+    def date_slice(df, start_date, end_date):
+        """Return the rows with start_date <= Created Date <= end_date as a positional slice."""
+        epoch = df[TimeIndexHelper.EPOCH_COLUMN].to_numpy()
+        start = np.searchsorted(epoch, TimeIndexHelper.to_epoch(start_date), side='left')
+        end = np.searchsorted(epoch, TimeIndexHelper.to_epoch(end_date), side='right')
+        return df.iloc[start:end]
+
+    @staticmethod
+    def time_to_seconds(value):
+        """Convert a datetime.time to seconds since midnight."""
+        return value.hour * 3600 + value.minute * 60 + value.second
+
+    @staticmethod
+    def end_seconds(end_time):
+        """Seconds since midnight of the last second in end_time's minute, so a frame ending 16:59 covers 16:59:59."""
+        return TimeIndexHelper.time_to_seconds(end_time) // 60 * 60 + 59
+
+    @staticmethod
+    def time_mask(seconds, start_time, end_time):
+        """
+        Boolean mask of rows whose time of day is within start_time..end_time, the end minute
+        included in full. A window whose start is after its end wraps past midnight, e.g. 22:00 - 06:00.
+        """
+        start = TimeIndexHelper.time_to_seconds(start_time)
+        end = TimeIndexHelper.end_seconds(end_time)
+        if start <= end:
+            return (seconds >= start) & (seconds <= end)
+        return (seconds >= start) | ((seconds >= 0) & (seconds <= end))
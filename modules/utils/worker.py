@@ -0,0 +1,128 @@
+from concurrent.futures import Future
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from modules.utils.cancel_token import CancelToken, OperationCancelled
+from modules.utils.logger_manager import LoggerManager
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by a Worker; connected slots run on the UI thread."""
+
+    progress = pyqtSignal(int, str)  # Overall percent, stage message
+    finished = pyqtSignal(object)    # Task result
+    error = pyqtSignal(object)       # The exception raised by the task
+    cancelled = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """
+    Runs fn(worker, *args, **kwargs) on the global QThreadPool.
+
+    The task reports progress through worker.progress() or a worker.stage() callback, both
+    of which also act as cancellation checks. The outcome is delivered through the signals
+    and through worker.future for code that has to wait for it.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.setAutoDelete(False)  # The Python side keeps the worker (and its future) alive
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.cancel_token = CancelToken()
+        self.future = Future()
+        self.logger = LoggerManager()
+
+    def start(self):
+        """Queue the worker on the global thread pool."""
+        QThreadPool.globalInstance().start(self)
+        return self
+
+    def cancel(self):
+        """Request cooperative cancellation."""
+        self.cancel_token.cancel()
+
+    def progress(self, percent, message=""):
+        """Report overall progress (0-100); raises OperationCancelled once cancelled."""
+        self.cancel_token.check()
+        self.signals.progress.emit(int(percent), message)
+
+    def stage(self, start, end, message):
+        """
+        Return a progress callback for one stage of the task: the stage's own 0-100 progress
+        is mapped onto start..end of the overall bar. Extra callback arguments (such as the
+        rows read by FileHelper readers) are ignored.
+        """
+        def report(percent, *_):
+            self.progress(start + (end - start) * min(max(percent, 0), 100) / 100, message)
+        return report
+
+    def run(self):
+        try:
+            self.cancel_token.check()
+            result = self.fn(self, *self.args, **self.kwargs)
+        except OperationCancelled as e:
+            self.logger.log_info(f"Task {getattr(self.fn, '__name__', self.fn)} cancelled")
+            self.future.set_exception(e)
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.logger.log_error(f"Task {getattr(self.fn, '__name__', self.fn)} failed: {e}")
+            self.future.set_exception(e)
+            self.signals.error.emit(e)
+        else:
+            self.future.set_result(result)
+            self.signals.finished.emit(result)
+
+
+class TaskController:
+    """Starts a panel's workers, drives its progress bar and Cancel button, and cancels on request."""
+
+    def __init__(self, progress_bar=None, cancel_button=None, logger=None):
+        self.progress_bar = progress_bar
+        self.cancel_button = cancel_button
+        self.logger = logger if logger else LoggerManager()
+        self.workers = []
+        if self.cancel_button is not None:
+            self.cancel_button.setEnabled(False)
+            self.cancel_button.clicked.connect(self.cancel_all)
+
+    def run(self, fn, *args, on_finished=None, on_error=None, on_cancelled=None, **kwargs):
+        """Run fn(worker, *args, **kwargs) in the background and return its Worker."""
+        return self.start(Worker(fn, *args, **kwargs), on_finished, on_error, on_cancelled)
+
+    def start(self, worker, on_finished=None, on_error=None, on_cancelled=None):
+        """Track and start an already created Worker."""
+        worker.signals.progress.connect(self._show_progress)
+        for signal, slot in ((worker.signals.finished, on_finished), (worker.signals.error, on_error),
+                             (worker.signals.cancelled, on_cancelled)):
+            signal.connect(lambda *result, w=worker: self._done(w))
+            if slot is not None:
+                signal.connect(slot)
+
+        self.workers.append(worker)
+        if self.cancel_button is not None:
+            self.cancel_button.setEnabled(True)
+        return worker.start()
+
+    def cancel_all(self):
+        """Cancel every running worker."""
+        for worker in self.workers:
+            worker.cancel()
+        self.logger.log_info(f"Cancellation requested for {len(self.workers)} task(s)")
+
+    def is_busy(self):
+        return bool(self.workers)
+
+    def _show_progress(self, percent, message):
+        if self.progress_bar is not None:
+            self.progress_bar.setValue(percent)
+            self.progress_bar.setFormat(f"{message} %p%" if message else "%p%")
+
+    def _done(self, worker):
+        if worker in self.workers:
+            self.workers.remove(worker)
+        if not self.workers:
+            if self.cancel_button is not None:
+                self.cancel_button.setEnabled(False)
+            if self.progress_bar is not None:
+                self.progress_bar.setFormat("%p%")
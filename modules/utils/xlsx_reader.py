@@ -0,0 +1,104 @@
+# Built on private openpyxl internals; requirements.txt pins the exact openpyxl version this was written against.
+from contextlib import contextmanager
+from openpyxl.cell.text import Text
+from openpyxl.reader.excel import ExcelReader, SHARED_STRINGS
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet
+from openpyxl.worksheet.dimensions import SheetDimension
+from openpyxl.xml.constants import SHEET_MAIN_NS
+from openpyxl.xml.functions import iterparse
+
+
+class LazySharedStrings:
+    """
+    A workbook's shared string table, parsed only as far as the highest index asked for.
+    Writers add strings in order of first use, so the first rows of a sheet need only the
+    start of the table instead of all of it.
+    """
+
+    STRING_TAG = '{%s}si' % SHEET_MAIN_NS
+
+    def __init__(self, source):
+        self._source = source
+        self._nodes = iterparse(source)
+        self._strings = []
+
+    def __getitem__(self, index):
+        while index >= len(self._strings) and self._nodes is not None:
+            self._parse_next()
+        return self._strings[index]
+
+    def __len__(self):
+        while self._nodes is not None:
+            self._parse_next()
+        return len(self._strings)
+
+    def _parse_next(self):
+        """Parse up to the next string, as openpyxl's read_string_table does."""
+        for _, node in self._nodes:
+            if node.tag == self.STRING_TAG:
+                text = Text.from_tree(node).content
+                node.clear()
+                self._strings.append(text.replace('x005F_', ''))
+                return
+        self.close()
+
+    def close(self):
+        self._nodes = None
+        self._source.close()
+
+
+class LazyReadOnlyWorksheet(ReadOnlyWorksheet):
+    """
+    A read-only worksheet that looks for its <dimension> only before the rows start. openpyxl's
+    own check parses the whole sheet when the element is missing, as in write-only output.
+    """
+
+    DIMENSION_TAG = '{%s}dimension' % SHEET_MAIN_NS
+    DATA_TAG = '{%s}sheetData' % SHEET_MAIN_NS
+
+    def _get_size(self):
+        with self._get_source() as src:
+            for _, element in iterparse(src, events=('start',)):
+                if element.tag == self.DIMENSION_TAG:
+                    self._min_column, self._min_row, self._max_column, self._max_row = \
+                        SheetDimension.from_tree(element).boundaries
+                    return
+                if element.tag == self.DATA_TAG:
+                    return  # Dimensions missing: the size stays unknown
+
+
+class LazyExcelReader(ExcelReader):
+    """
+    openpyxl's read-only workbook reader, with the shared string table parsed on demand and
+    sheet sizes read from the sheet header only, so opening a workbook costs the same at any size.
+    """
+
+    def read_strings(self):
+        ct = self.package.find(SHARED_STRINGS)
+        if ct is not None:
+            self.shared_strings = LazySharedStrings(self.archive.open(ct.PartName[1:]))
+
+    def read_worksheets(self):
+        """The read-only branch of ExcelReader.read_worksheets, with LazyReadOnlyWorksheet sheets."""
+        for sheet, rel in self.parser.find_sheets():
+            if rel.target not in self.valid_files:
+                continue
+            if "chartsheet" in rel.Type:
+                self.read_chartsheet(sheet, rel)
+                continue
+            ws = LazyReadOnlyWorksheet(self.wb, sheet.name, rel.target, self.shared_strings)
+            ws.sheet_state = sheet.state
+            self.wb._sheets.append(ws)
+
+    @staticmethod
+    @contextmanager
+    def open_workbook(file_path):
+        """Open a workbook read-only with cached values, closing it and its string table afterwards."""
+        reader = LazyExcelReader(file_path, read_only=True, data_only=True)
+        reader.read()
+        try:
+            yield reader.wb
+        finally:
+            reader.wb.close()
+            if isinstance(reader.shared_strings, LazySharedStrings):
+                reader.shared_strings.close()
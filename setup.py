@@ -16,7 +16,7 @@ setup(
     python_requires='>=3.11.6',  # Specify the Python version here
     install_requires=[
         'et-xmlfile==1.1.0',
-        'openpyxl==3.1.5',
+        'openpyxl==3.1.5',  # Exact pin: modules/utils/xlsx_reader.py relies on private openpyxl internals
         'pandas==2.2.3',
         'PyQt6',
         'PyQt6-Qt6',